@@ -1,17 +1,23 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, UploadFile, File, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 import pandas as pd
-from typing import Dict, Any, Optional
+import pyarrow as pa
+from typing import Dict, Any, Optional, Iterator
 import os
+import shutil
+import asyncio
 from pathlib import Path
 import json
+import orjson
 
 from handlers.file_handler import FileHandlerFactory
-from handlers.db_handler import DBHandlerFactory
+from handlers.db_handler import DBHandlerFactory, frame_to_records
 from handlers.query_handler import QueryHandler
 from processors.data_processor import DataProcessor
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 # Configure CORS
 app.add_middleware(
@@ -30,25 +36,66 @@ UPLOAD_DIR.mkdir(exist_ok=True)
 VISUALIZATIONS_DIR = Path("visualizations")
 VISUALIZATIONS_DIR.mkdir(exist_ok=True)
 
+# Buffer size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Content type accepted by the columnar /visualize/arrow and /process/arrow endpoints
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+# Media type of the row-streaming /query/rows endpoint
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
 # Initialize handlers and processors
 data_processor = DataProcessor()
 query_handler = QueryHandler()
 
+async def read_arrow_frame(request: Request) -> pd.DataFrame:
+    """Rebuild a DataFrame from an Arrow IPC stream body, viewing the Arrow buffers without re-boxing values"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type != ARROW_STREAM_MEDIA_TYPE:
+        raise HTTPException(status_code=415, detail=f"Expected a {ARROW_STREAM_MEDIA_TYPE} request body")
+    
+    body = await request.body()
+    try:
+        table = pa.ipc.open_stream(body).read_all()
+    except pa.ArrowException as e:
+        raise HTTPException(status_code=400, detail=f"Invalid Arrow IPC stream: {str(e)}")
+    return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+def render_visualization(
+    df: pd.DataFrame,
+    viz_type: str,
+    x: Optional[str] = None,
+    y: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """Create and save a visualization, returning the response payload"""
+    fig = data_processor.create_visualization(df, viz_type, x, y, **kwargs)
+    
+    # Save the visualization
+    filename = f"visualizations/{viz_type}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}"
+    data_processor.save_visualization(fig, filename)
+    
+    return {
+        "status": "success",
+        "message": "Visualization created successfully",
+        "filename": f"{filename}.png"
+    }
+
 @app.post("/upload")
 async def upload_file(file: UploadFile = File(...)) -> Dict[str, Any]:
     """Handle file upload and process it"""
+    file_path = UPLOAD_DIR / file.filename
     try:
-        # Save the uploaded file
-        file_path = UPLOAD_DIR / file.filename
+        # Stream the uploaded file to disk in 1 MB chunks
         with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
+            await run_in_threadpool(shutil.copyfileobj, file.file, f, UPLOAD_CHUNK_SIZE)
         
-        # Process the file using appropriate handler
-        df = FileHandlerFactory.process_file(str(file_path))
+        # Process the file using appropriate handler, off the event loop
+        df = await run_in_threadpool(FileHandlerFactory.process_file, str(file_path))
         
         # Generate initial summary
-        summary = data_processor.get_summary(df)
+        summary = await run_in_threadpool(data_processor.get_summary, df)
         
         return {
             "status": "success",
@@ -69,7 +116,7 @@ async def connect_database(
 ) -> Dict[str, Any]:
     """Connect to a database"""
     try:
-        db_handler = DBHandlerFactory.create_connection(db_type, connection_string)
+        db_handler = await run_in_threadpool(DBHandlerFactory.create_connection, db_type, connection_string)
         return {
             "status": "success",
             "message": f"Successfully connected to {db_type} database"
@@ -85,22 +132,54 @@ async def execute_query(
 ) -> Dict[str, Any]:
     """Execute a database query"""
     try:
-        db_handler = DBHandlerFactory.create_connection(db_type, connection_string)
-        df = db_handler.execute_query(query)
+        db_handler = await run_in_threadpool(DBHandlerFactory.create_connection, db_type, connection_string)
+        df = await run_in_threadpool(db_handler.execute_query, query)
         
         # Generate summary and insights
-        summary = data_processor.get_summary(df)
-        insights = data_processor.generate_insights(df)
+        summary, insights = await run_in_threadpool(data_processor.summarize_and_insights, df)
         
         return {
             "status": "success",
-            "data": df.to_dict(orient="records"),
+            "data": frame_to_records(df),
             "summary": summary,
             "insights": insights
         }
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+def ndjson_rows(chunks: Iterator[pd.DataFrame]) -> Iterator[bytes]:
+    """Yield each DataFrame chunk's rows as NDJSON lines.
+
+    Errors after the response has started are reported as a final {"type": "error"} line.
+    """
+    try:
+        for chunk in chunks:
+            yield b"".join(orjson.dumps(record) + b"\n" for record in frame_to_records(chunk))
+    except Exception as e:
+        yield orjson.dumps({"type": "error", "detail": str(e)}) + b"\n"
+
+@app.post("/query/rows")
+async def execute_query_rows(
+    db_type: str,
+    connection_string: str,
+    query: str
+):
+    """Execute a database query and stream its rows as NDJSON, one line per row, without summary or insights"""
+    try:
+        db_handler = await run_in_threadpool(DBHandlerFactory.create_connection, db_type, connection_string)
+        chunks = db_handler.stream_query(query)
+        # Run the query and fetch the first chunk up front, so SQL errors still get a 400
+        first_chunk = await run_in_threadpool(next, chunks, None)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    def all_chunks() -> Iterator[pd.DataFrame]:
+        if first_chunk is not None:
+            yield first_chunk
+            yield from chunks
+    
+    return StreamingResponse(ndjson_rows(all_chunks()), media_type=NDJSON_MEDIA_TYPE)
+
 @app.post("/visualize")
 async def create_visualization(
     data: Dict[str, Any],
@@ -112,17 +191,21 @@ async def create_visualization(
     """Create a visualization"""
     try:
         df = pd.DataFrame(data)
-        fig = data_processor.create_visualization(df, viz_type, x, y, **kwargs)
-        
-        # Save the visualization
-        filename = f"visualizations/{viz_type}_{pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')}"
-        data_processor.save_visualization(fig, filename)
-        
-        return {
-            "status": "success",
-            "message": "Visualization created successfully",
-            "filename": f"{filename}.png"
-        }
+        return await run_in_threadpool(render_visualization, df, viz_type, x, y, **kwargs)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.post("/visualize/arrow")
+async def create_visualization_arrow(
+    request: Request,
+    viz_type: str,
+    x: Optional[str] = None,
+    y: Optional[str] = None
+) -> Dict[str, Any]:
+    """Create a visualization from an Arrow IPC stream body (application/vnd.apache.arrow.stream)"""
+    df = await read_arrow_frame(request)
+    try:
+        return await run_in_threadpool(render_visualization, df, viz_type, x, y)
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -134,11 +217,10 @@ async def process_data(
     """Process data with specified operations"""
     try:
         df = pd.DataFrame(data)
-        result_df = data_processor.process_data(df, operations)
+        result_df = await run_in_threadpool(data_processor.process_data, df, operations)
         
         # Generate new summary and insights
-        summary = data_processor.get_summary(result_df)
-        insights = data_processor.generate_insights(result_df)
+        summary, insights = await run_in_threadpool(data_processor.summarize_and_insights, result_df)
         
         return {
             "status": "success",
@@ -149,6 +231,28 @@ async def process_data(
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@app.post("/process/arrow")
+async def process_data_arrow(
+    request: Request,
+    operations: str
+) -> Dict[str, Any]:
+    """Process an Arrow IPC stream body (application/vnd.apache.arrow.stream); operations is a JSON-encoded list"""
+    df = await read_arrow_frame(request)
+    try:
+        result_df = await run_in_threadpool(data_processor.process_data, df, json.loads(operations))
+        
+        # Generate new summary and insights
+        summary, insights = await run_in_threadpool(data_processor.summarize_and_insights, result_df)
+        
+        return {
+            "status": "success",
+            "data": frame_to_records(result_df),
+            "summary": summary,
+            "insights": insights
+        }
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @app.post("/ask")
 async def ask_question(
     question: str,
@@ -157,16 +261,25 @@ async def ask_question(
 ) -> Dict[str, Any]:
     """Process a natural language question about the data"""
     try:
-        # Connect to database
-        db_handler = DBHandlerFactory.create_connection(db_type, connection_string)
+        # Connect to database and generate SQL concurrently; neither depends on the other
+        db_handler, sql_query = await asyncio.gather(
+            run_in_threadpool(DBHandlerFactory.create_connection, db_type, connection_string),
+            run_in_threadpool(query_handler.convert_to_sql, question),
+            return_exceptions=True
+        )
+        if isinstance(db_handler, Exception):
+            raise db_handler
+        if isinstance(sql_query, Exception):
+            # Let process_question retry and fall back to suggestions
+            sql_query = None
         
         # Process the question
-        result = query_handler.process_question(question, db_handler)
+        result = await run_in_threadpool(query_handler.process_question, question, db_handler, sql_query)
         
         # Generate insights if needed
         if isinstance(result["result"], list):
             df = pd.DataFrame(result["raw_data"])
-            insights = data_processor.generate_insights(df, question)
+            insights = await run_in_threadpool(data_processor.generate_insights, df, question)
             result["insights"] = insights
         
         return {
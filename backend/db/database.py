@@ -1,12 +1,15 @@
 import mysql.connector
 from mysql.connector import Error
 from typing import Dict, List, Any, Optional
+from collections import defaultdict
 import json
 
 class DatabaseConnection:
     def __init__(self):
         self.connection = None
         self.cursor = None
+        # Column definitions for every table, filled by get_all_schemas
+        self.schemas: Optional[Dict[str, List[Dict[str, Any]]]] = None
 
     def connect(self, host: str, user: str, password: str, database: str) -> bool:
         try:
@@ -17,6 +20,7 @@ class DatabaseConnection:
                 database=database
             )
             self.cursor = self.connection.cursor(dictionary=True)
+            self.schemas = None
             return True
         except Error as e:
             print(f"Error connecting to MySQL: {e}")
@@ -40,7 +44,30 @@ class DatabaseConnection:
             print(f"Error getting tables: {e}")
             return []
 
+    def get_all_schemas(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch the columns of every table in one information_schema query, shaped like DESCRIBE rows."""
+        if self.schemas is not None:
+            return self.schemas
+        try:
+            self.cursor.execute("""
+                SELECT TABLE_NAME AS table_name, COLUMN_NAME AS Field, COLUMN_TYPE AS Type,
+                       IS_NULLABLE AS `Null`, COLUMN_KEY AS `Key`, COLUMN_DEFAULT AS `Default`, EXTRA AS Extra
+                FROM information_schema.columns
+                WHERE table_schema = DATABASE()
+                ORDER BY table_name, ordinal_position
+            """)
+            schemas = defaultdict(list)
+            for row in self.cursor.fetchall():
+                schemas[row.pop('table_name')].append(row)
+            self.schemas = dict(schemas)
+            return self.schemas
+        except Error as e:
+            print(f"Error getting table schemas: {e}")
+            return {}
+
     def get_table_schema(self, table_name: str) -> List[Dict[str, Any]]:
+        if self.schemas is not None and table_name in self.schemas:
+            return self.schemas[table_name]
         try:
             self.cursor.execute(f"DESCRIBE {table_name}")
             return self.cursor.fetchall()
@@ -72,7 +99,8 @@ class DatabaseConnection:
 
     def get_table_preview(self, table_name: str, limit: int = 5) -> Dict[str, Any]:
         try:
-            self.cursor.execute(f"SELECT * FROM {table_name} LIMIT {limit}")
+            quoted_name = table_name.replace("`", "``")
+            self.cursor.execute(f"SELECT * FROM `{quoted_name}` LIMIT %s", (limit,))
             results = self.cursor.fetchall()
             return {
                 "success": True,
@@ -1,26 +1,81 @@
-from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Float, DateTime, Boolean, JSON, text
+from sqlalchemy import MetaData, Table, Column, Integer, String, Float, DateTime, Boolean, JSON, text, table, column, insert
+from sqlalchemy.sql.expression import Insert, TableClause
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import NoSuchTableError
 import pandas as pd
+import pyarrow as pa
 from datetime import datetime
 import json
 import os
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+import functools
+import uuid
 import logging
 
+from .models import get_engine
+
 logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
+# SQLite column type for each numpy dtype kind; anything unlisted is stored as TEXT
+_KIND_TO_SQL = {
+    'i': 'INTEGER',
+    'u': 'INTEGER',
+    'f': 'REAL',
+    'M': 'DATETIME',
+    'b': 'BOOLEAN',
+    'O': 'TEXT',
+}
+
+class _CleanNameTable(dict):
+    """str.translate table mapping non-alphanumeric characters to '_', filled lazily per code point."""
+    def __missing__(self, code: int) -> Any:
+        value = code if chr(code).isalnum() else '_'
+        self[code] = value
+        return value
+
+_CLEAN_TABLE = _CleanNameTable({code: (code if chr(code).isalnum() else '_') for code in range(256)})
+
+def _clean_name(name: Any) -> str:
+    """Lowercase a table/column name and replace non-alphanumeric characters with underscores."""
+    return str(name).lower().translate(_CLEAN_TABLE)
+
+def _is_nested_arrow(dtype: Any) -> bool:
+    """True for Arrow-backed struct/list/map columns, which are stored as JSON."""
+    return isinstance(dtype, pd.ArrowDtype) and pa.types.is_nested(dtype.pyarrow_dtype)
+
+@functools.lru_cache(maxsize=128)
+def _insert_statement(table_name: str, columns: Tuple[Tuple[str, bool], ...]) -> Insert:
+    """Build (once per table/column shape) the INSERT used for bulk loading.
+
+    columns holds (name, is_json) pairs; JSON columns serialize dict/list values on insert.
+    """
+    return insert(table(table_name, *[column(col, JSON) if is_json else column(col) for col, is_json in columns]))
+
+def _frame_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Rows of df as dicts of Python scalars; Arrow-backed columns go through pyarrow so nulls become None, not pd.NA."""
+    if any(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes):
+        return pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+    return df.to_dict(orient='records')
+
 class DynamicTableManager:
     def __init__(self, database_url: str):
-        self.engine = create_engine(database_url)
+        # Shares the SQLite PRAGMA tuning of the application engine
+        self.engine = get_engine(database_url)
         self.metadata = MetaData()
         self.Session = sessionmaker(bind=self.engine)
+        # Schemas keyed by table name; invalidated whenever tables are (re)created or dropped
+        self._schema_cache: Dict[str, Dict[str, Any]] = {}
+        # Table names, invalidated on the same events
+        self._tables_cache: Optional[List[str]] = None
+        # Opaque token that changes whenever table contents may have changed (e.g. for HTTP ETags)
+        self.data_version = uuid.uuid4().hex
         
     def reset_database(self) -> None:
-        """Reset the database by dropping all existing tables."""
-        with self.engine.connect() as conn:
+        """Reset the database by dropping all existing tables in a single transaction."""
+        with self.engine.begin() as conn:
             # Get list of all tables
             result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
             tables = [row[0] for row in result]
@@ -28,56 +83,43 @@ class DynamicTableManager:
             # Drop each table
             for table in tables:
                 if table != 'sqlite_sequence':  # Skip SQLite's internal sequence table
-                    conn.execute(text(f'DROP TABLE IF EXISTS "{table}"'))
-            conn.commit()
+                    conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{table}"')
             
             # Reset SQLite sequence if it exists
-            try:
-                conn.execute(text("DELETE FROM sqlite_sequence"))
-                conn.commit()
-            except Exception as e:
-                # Ignore error if sqlite_sequence doesn't exist
-                pass
+            if 'sqlite_sequence' in tables:
+                conn.exec_driver_sql("DELETE FROM sqlite_sequence")
         
         # Refresh metadata
+        self._schema_cache.clear()
+        self._tables_cache = None
+        self.data_version = uuid.uuid4().hex
         self.metadata.clear()
         self.metadata.reflect(bind=self.engine)
 
-    def _infer_column_type(self, dtype: str, sample_value: Any) -> str:
-        """Infer SQLite column type from pandas dtype and sample value."""
-        if pd.api.types.is_integer_dtype(dtype):
-            return 'INTEGER'
-        elif pd.api.types.is_float_dtype(dtype):
-            return 'REAL'
-        elif pd.api.types.is_datetime64_dtype(dtype):
-            return 'DATETIME'
-        elif pd.api.types.is_bool_dtype(dtype):
-            return 'BOOLEAN'
-        elif pd.api.types.is_object_dtype(dtype):
-            # Check if it's a JSON string
-            if isinstance(sample_value, (dict, list)):
-                return 'JSON'
-            return 'TEXT'
-        else:
-            return 'TEXT'  # Default to TEXT for unknown types
-
-    def create_table_from_dataframe(self, df: pd.DataFrame, table_name: str) -> Table:
-        """Create a new table based on DataFrame structure."""
+    def create_table_from_dataframe(self, df: pd.DataFrame, table_name: str) -> TableClause:
+        """Create a new table based on DataFrame structure and return a lightweight descriptor of it."""
         # Clean table name (remove special characters, spaces, etc.)
-        table_name = ''.join(c if c.isalnum() else '_' for c in table_name.lower())
-        
-        # Drop existing table if it exists
-        with self.engine.connect() as conn:
-            conn.execute(text(f'DROP TABLE IF EXISTS "{table_name}"'))
-            conn.commit()
+        table_name = _clean_name(table_name)
         
+        # Legacy NumPy object columns holding dicts/lists in their first row are stored as JSON;
+        # Arrow-backed columns carry this in their type and need no sampling
+        first_objects = df.select_dtypes(include='object').head(1)
+        json_columns = {
+            col for col, value in first_objects.iloc[0].items()
+            if isinstance(value, (dict, list))
+        } if not first_objects.empty else set()
+
         # Create table using raw SQL
         columns = []
+        table_columns = []
         for col_name, dtype in df.dtypes.items():
-            sample_value = df[col_name].iloc[0] if not df[col_name].empty else None
-            column_type = self._infer_column_type(dtype, sample_value)
+            if col_name in json_columns or _is_nested_arrow(dtype):
+                column_type = 'JSON'
+            else:
+                column_type = _KIND_TO_SQL.get(dtype.kind, 'TEXT')
             # Clean column name
-            clean_col_name = ''.join(c if c.isalnum() else '_' for c in col_name.lower())
+            clean_col_name = _clean_name(col_name)
+            table_columns.append(column(clean_col_name, JSON) if column_type == 'JSON' else column(clean_col_name))
             columns.append(f'"{clean_col_name}" {column_type}')
         
         # Add id column as primary key
@@ -88,60 +130,82 @@ class DynamicTableManager:
         )
         """
         
-        with self.engine.connect() as conn:
-            conn.execute(text(create_table_sql))
-            conn.commit()
+        # Drop any existing table and create the new one in a single transaction
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(f'DROP TABLE IF EXISTS "{table_name}"')
+            conn.exec_driver_sql(create_table_sql)
+        
+        # Forget any stale schema for the replaced table
+        self._schema_cache.pop(table_name, None)
+        self._tables_cache = None
+        self.data_version = uuid.uuid4().hex
         
-        # Return the table object
-        return Table(table_name, self.metadata, autoload_with=self.engine)
+        # Describe the new table without reflecting it back from the database
+        return table(table_name, *table_columns)
 
-    def insert_dataframe(self, df: pd.DataFrame, table_name: str) -> None:
-        """Insert DataFrame data into the specified table."""
-        # Reset the database before creating new table
-        self.reset_database()
+    def insert_dataframe(self, df: pd.DataFrame, table_name: str, replace_all: bool = False) -> None:
+        """Insert DataFrame data into the specified table, replacing any existing table of that name.
+
+        Pass replace_all=True to drop every other table in the database first.
+        """
+        if replace_all:
+            self.reset_database()
         
         # Clean column names
-        df.columns = [''.join(c if c.isalnum() else '_' for c in col.lower()) for col in df.columns]
+        df.columns = [_clean_name(col) for col in df.columns]
         
         # Create table
-        table = self.create_table_from_dataframe(df, table_name)
+        created_table = self.create_table_from_dataframe(df, table_name)
         
         # Convert DataFrame to list of dictionaries
-        records = df.to_dict(orient='records')
+        records = _frame_records(df)
         
-        # Insert data using raw SQL for better performance
         if records:
-            columns = list(records[0].keys())
-            placeholders = ', '.join([':{}'.format(i) for i in range(len(columns))])
-            insert_sql = f"""
-            INSERT INTO "{table_name}" ({', '.join(f'"{col}"' for col in columns)})
-            VALUES ({placeholders})
-            """
-            
-            with self.engine.connect() as conn:
-                for record in records:
-                    # Convert values to a dictionary with named parameters
-                    params = {str(i): record[col] for i, col in enumerate(columns)}
-                    conn.execute(text(insert_sql), params)
-                conn.commit()
+            # Reuse the INSERT built for this table/column shape
+            insert_stmt = _insert_statement(
+                created_table.name,
+                tuple((col.name, isinstance(col.type, JSON)) for col in created_table.columns)
+            )
+
+            # Passing the full record list dispatches a single executemany in one transaction
+            with self.engine.begin() as conn:
+                conn.execute(insert_stmt, records)
+            self.data_version = uuid.uuid4().hex
 
     def get_table_schema(self, table_name: str) -> Dict[str, Any]:
-        """Get the schema of a table."""
-        table = Table(table_name, self.metadata, autoload_with=self.engine)
-        return {
-            'columns': [{'name': col.name, 'type': str(col.type)} for col in table.columns],
-            'primary_key': [col.name for col in table.primary_key.columns]
-        }
+        """Get the schema of a table from a single PRAGMA table_info query, cached per table."""
+        schema = self._schema_cache.get(table_name)
+        if schema is None:
+            quoted_name = table_name.replace('"', '""')
+            with self.engine.connect() as conn:
+                # Rows are (cid, name, type, notnull, dflt_value, pk)
+                rows = conn.exec_driver_sql(f'PRAGMA table_info("{quoted_name}")').fetchall()
+            if not rows:
+                raise NoSuchTableError(table_name)
+            schema = {
+                'columns': [{'name': row[1], 'type': row[2]} for row in rows],
+                'primary_key': [row[1] for row in sorted(rows, key=lambda row: row[5]) if row[5]]
+            }
+            self._schema_cache[table_name] = schema
+        return schema
 
     def list_tables(self) -> List[str]:
-        """List all tables in the database."""
+        """List all tables in the database, cached until tables are (re)created or dropped."""
+        if self._tables_cache is None:
+            with self.engine.connect() as conn:
+                result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
+                self._tables_cache = [row[0] for row in result]
+        return list(self._tables_cache)
+
+    def count_rows(self, table_name: str) -> int:
+        """Count the rows of a table with COUNT(*), without fetching any of them."""
         with self.engine.connect() as conn:
-            result = conn.execute(text("SELECT name FROM sqlite_master WHERE type='table'"))
-            return [row[0] for row in result]
+            quoted_name = table_name.replace('"', '""')
+            return conn.execute(text(f'SELECT COUNT(*) FROM "{quoted_name}"')).scalar_one()
 
     def get_table_data(self, table_name: str, limit: int = 100) -> List[Dict[str, Any]]:
         """Get sample data from a table."""
         with self.engine.connect() as conn:
-            result = conn.execute(text(f'SELECT * FROM "{table_name}" LIMIT {limit}'))
-            columns = result.keys()
-            return [dict(zip(columns, row)) for row in result] 
\ No newline at end of file
+            quoted_name = table_name.replace('"', '""')
+            result = conn.execute(text(f'SELECT * FROM "{quoted_name}" LIMIT :limit'), {'limit': limit})
+            return [dict(row) for row in result.mappings()] 
\ No newline at end of file
@@ -1,12 +1,39 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
 
+# Per-connection SQLite tuning: WAL journaling, relaxed fsync, mmap'd reads, a 64 MB page cache,
+# and a busy timeout so readers and the upload writer wait on each other instead of failing
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+# Prepared statements kept per sqlite3 connection (the driver default is 100, or 128 from Python 3.11);
+# repeated queries skip SQLite's parse and plan
+SQLITE_STATEMENT_CACHE_SIZE = 512
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Apply SQLITE_PRAGMAS to a freshly opened DBAPI connection."""
+    cursor = dbapi_connection.cursor()
+    for pragma in SQLITE_PRAGMAS:
+        cursor.execute(pragma)
+    cursor.close()
+
 def get_engine(database_url: str):
-    return create_engine(database_url)
+    if make_url(database_url).get_backend_name() != 'sqlite':
+        return create_engine(database_url)
+    engine = create_engine(database_url, connect_args={'cached_statements': SQLITE_STATEMENT_CACHE_SIZE})
+    event.listen(engine, 'connect', _apply_sqlite_pragmas)
+    return engine
 
 def init_db(database_url: str):
     engine = get_engine(database_url)
     Base.metadata.create_all(engine)
-    return engine 
\ No newline at end of file
+    return engine 
@@ -1,13 +1,36 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
-from sqlalchemy import create_engine, Engine
+from typing import Dict, Any, Optional, Tuple, Iterator, List
+from sqlalchemy import create_engine, Engine, text
 from sqlalchemy.engine import URL
 import pandas as pd
+import pyarrow as pa
 import os
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Pool settings shared by every handler so connections are reused across requests
+ENGINE_OPTIONS = {
+    "pool_size": 10,
+    "pool_pre_ping": True
+}
+
+# Maximum number of validated handlers (each holding a connection pool) kept by DBHandlerFactory
+MAX_CACHED_CONNECTIONS = 16
+
+# Rows per chunk when streaming large result sets
+STREAM_CHUNK_SIZE = 50_000
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert an Arrow-backed DataFrame to JSON-safe records (nulls become None)"""
+    if not df.columns.is_unique:
+        # Arrow tables reject duplicate names (e.g. SELECT a.*, b.* joins); keep to_dict's
+        # behaviour of one key per name, the last column winning
+        return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+    return pa.Table.from_pandas(df, preserve_index=False).to_pylist()
+
 class DBHandler(ABC):
     """Abstract base class for database handlers"""
     
@@ -26,10 +49,16 @@ class DBHandler(ABC):
         pass
     
     def execute_query(self, query: str) -> pd.DataFrame:
-        """Execute a SQL query and return results as DataFrame"""
+        """Execute a SQL query and return results as an Arrow-backed DataFrame"""
+        if not self.engine:
+            self.engine = self.connect()
+        return pd.read_sql(query, self.engine, dtype_backend="pyarrow")
+    
+    def stream_query(self, query: str, chunksize: int = STREAM_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+        """Execute a SQL query and yield Arrow-backed DataFrame chunks without buffering the full result"""
         if not self.engine:
             self.engine = self.connect()
-        return pd.read_sql(query, self.engine)
+        yield from pd.read_sql(query, self.engine, chunksize=chunksize, dtype_backend="pyarrow")
     
     def close(self):
         """Close the database connection"""
@@ -38,14 +67,14 @@ class DBHandler(ABC):
 
 class SQLiteHandler(DBHandler):
     def connect(self) -> Engine:
-        self.engine = create_engine(f"sqlite:///{self.connection_string}")
+        self.engine = create_engine(f"sqlite:///{self.connection_string}", **ENGINE_OPTIONS)
         return self.engine
     
     def validate_connection(self) -> bool:
         try:
             engine = self.connect()
             with engine.connect() as conn:
-                conn.execute("SELECT 1")
+                conn.execute(text("SELECT 1"))
             return True
         except Exception as e:
             print(f"SQLite connection error: {e}")
@@ -61,14 +90,14 @@ class PostgreSQLHandler(DBHandler):
             port=os.getenv("DB_PORT"),
             database=self.connection_string
         )
-        self.engine = create_engine(url)
+        self.engine = create_engine(url, **ENGINE_OPTIONS)
         return self.engine
     
     def validate_connection(self) -> bool:
         try:
             engine = self.connect()
             with engine.connect() as conn:
-                conn.execute("SELECT 1")
+                conn.execute(text("SELECT 1"))
             return True
         except Exception as e:
             print(f"PostgreSQL connection error: {e}")
@@ -84,14 +113,14 @@ class MySQLHandler(DBHandler):
             port=os.getenv("DB_PORT"),
             database=self.connection_string
         )
-        self.engine = create_engine(url)
+        self.engine = create_engine(url, **ENGINE_OPTIONS)
         return self.engine
     
     def validate_connection(self) -> bool:
         try:
             engine = self.connect()
             with engine.connect() as conn:
-                conn.execute("SELECT 1")
+                conn.execute(text("SELECT 1"))
             return True
         except Exception as e:
             print(f"MySQL connection error: {e}")
@@ -106,6 +135,10 @@ class DBHandlerFactory:
         'mysql': MySQLHandler
     }
     
+    # Validated handlers keyed by (db_type, connection_string), least recently used first
+    _connections: "OrderedDict[Tuple[str, str], DBHandler]" = OrderedDict()
+    _connections_lock = threading.Lock()
+    
     @classmethod
     def get_handler(cls, db_type: str, connection_string: str) -> DBHandler:
         """Get the appropriate handler for the database type"""
@@ -118,10 +151,36 @@ class DBHandlerFactory:
     
     @classmethod
     def create_connection(cls, db_type: str, connection_string: str) -> DBHandler:
-        """Create and validate a database connection"""
-        handler = cls.get_handler(db_type, connection_string)
+        """Create and validate a database connection, reusing a cached handler when available"""
+        key = (db_type.lower(), connection_string)
         
+        with cls._connections_lock:
+            handler = cls._connections.get(key)
+            if handler is not None:
+                cls._connections.move_to_end(key)
+                return handler
+        
+        # Validate outside the lock so a slow or unreachable host does not block other lookups
+        handler = cls.get_handler(db_type, connection_string)
         if not handler.validate_connection():
+            handler.close()
             raise ConnectionError(f"Failed to connect to {db_type} database")
-            
+        
+        evicted = []
+        with cls._connections_lock:
+            existing = cls._connections.get(key)
+            if existing is not None:
+                # Another request validated the same connection meanwhile; keep its handler
+                cls._connections.move_to_end(key)
+                evicted.append(handler)
+                handler = existing
+            else:
+                cls._connections[key] = handler
+                while len(cls._connections) > MAX_CACHED_CONNECTIONS:
+                    evicted.append(cls._connections.popitem(last=False)[1])
+        
+        # Release the pools of dropped handlers outside the lock
+        for stale in evicted:
+            stale.close()
+        
         return handler 
\ No newline at end of file
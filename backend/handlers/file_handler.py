@@ -1,11 +1,15 @@
 from abc import ABC, abstractmethod
 import pandas as pd
+import pyarrow.csv as pa_csv
 from typing import Union, Dict, Any
 import json
 import csv
 import os
 from pathlib import Path
 
+# Block size for the multi-threaded PyArrow CSV reader
+CSV_BLOCK_SIZE = 1 << 20
+
 class FileHandler(ABC):
     """Abstract base class for file handlers"""
     
@@ -24,14 +28,16 @@ class CSVHandler(FileHandler):
         return file_path.lower().endswith('.csv')
     
     def read_file(self, file_path: str) -> pd.DataFrame:
-        return pd.read_csv(file_path)
+        read_options = pa_csv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE)
+        table = pa_csv.read_csv(file_path, read_options=read_options)
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
 
 class ExcelHandler(FileHandler):
     def validate_file(self, file_path: str) -> bool:
-        return file_path.lower().endswith(('.xlsx', '.xls'))
+        return file_path.lower().endswith(('.xlsx', '.xls', '.xlsb'))
     
     def read_file(self, file_path: str) -> pd.DataFrame:
-        return pd.read_excel(file_path)
+        return pd.read_excel(file_path, engine="calamine")
 
 class JSONHandler(FileHandler):
     def validate_file(self, file_path: str) -> bool:
@@ -53,6 +59,7 @@ class FileHandlerFactory:
         '.csv': CSVHandler,
         '.xlsx': ExcelHandler,
         '.xls': ExcelHandler,
+        '.xlsb': ExcelHandler,
         '.json': JSONHandler
     }
     
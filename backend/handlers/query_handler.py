@@ -1,12 +1,18 @@
 from typing import Dict, Any, Optional
-from langchain.chat_models import ChatGroq
+from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 import os
 from dotenv import load_dotenv
 import json
+import functools
+
+from handlers.db_handler import frame_to_records
 
 load_dotenv()
 
+# Maximum number of distinct questions whose LLM output is memoized
+LLM_CACHE_SIZE = 1024
+
 class QueryHandler:
     """Handler for converting natural language to SQL queries"""
     
@@ -52,11 +58,9 @@ class QueryHandler:
                 "How does product performance vary by season?"
             ]
         }
-    
-    def convert_to_sql(self, question: str) -> str:
-        """Convert natural language question to SQL query"""
         
-        prompt = ChatPromptTemplate.from_messages([
+        # Prompt chains are built once and invoked per question
+        self._sql_chain = ChatPromptTemplate.from_messages([
             ("system", """You are a SQL expert. Convert the given question into a SQL query.
             Use the following schema information:
             {schema_info}
@@ -68,10 +72,39 @@ class QueryHandler:
             4. Return only the SQL query without any explanation
             """),
             ("user", "Question: {question}\n\nSQL Query:")
-        ])
+        ]) | self.llm
+        
+        self._suggestions_chain = ChatPromptTemplate.from_messages([
+            ("system", """You are an expert data analyst. Given a question and available schema, 
+            determine which category of analysis it belongs to and suggest relevant questions.
+            Categories: customer_analysis, sales_analysis, product_analysis
+            Return a JSON with:
+            1. category: the most relevant category
+            2. explanation: why the question might be out of scope
+            3. suggestions: list of 3 most relevant questions from that category
+            """),
+            ("user", """Question: {question}
+            Schema: {schema_info}
+            Common Analyses: {common_analyses}
+            """)
+        ]) | self.llm
         
-        chain = prompt | self.llm
-        response = chain.invoke({
+        # Memoize LLM output per instance; schema_info is fixed for the lifetime of the handler
+        self._sql_cache = functools.lru_cache(maxsize=LLM_CACHE_SIZE)(self._generate_sql)
+        self._suggestions_cache = functools.lru_cache(maxsize=LLM_CACHE_SIZE)(self._generate_suggestions)
+    
+    @staticmethod
+    def _normalize_question(question: str) -> str:
+        """Collapse whitespace so trivially different phrasings share a cache entry"""
+        return " ".join(question.split())
+    
+    def convert_to_sql(self, question: str) -> str:
+        """Convert natural language question to SQL query, reusing cached results"""
+        return self._sql_cache(self._normalize_question(question))
+    
+    def _generate_sql(self, question: str) -> str:
+        """Ask the LLM to convert a natural language question to SQL"""
+        response = self._sql_chain.invoke({
             "schema_info": self.schema_info,
             "question": question
         })
@@ -86,24 +119,12 @@ class QueryHandler:
         return sql_query.strip()
     
     def generate_suggestions(self, question: str) -> Dict[str, Any]:
-        """Generate relevant suggestions based on the question and schema"""
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are an expert data analyst. Given a question and available schema, 
-            determine which category of analysis it belongs to and suggest relevant questions.
-            Categories: customer_analysis, sales_analysis, product_analysis
-            Return a JSON with:
-            1. category: the most relevant category
-            2. explanation: why the question might be out of scope
-            3. suggestions: list of 3 most relevant questions from that category
-            """),
-            ("user", """Question: {question}
-            Schema: {schema_info}
-            Common Analyses: {common_analyses}
-            """)
-        ])
-        
-        chain = prompt | self.llm
-        response = chain.invoke({
+        """Generate relevant suggestions based on the question and schema, reusing cached results"""
+        return self._suggestions_cache(self._normalize_question(question))
+    
+    def _generate_suggestions(self, question: str) -> Dict[str, Any]:
+        """Ask the LLM for suggestions relevant to the question and schema"""
+        response = self._suggestions_chain.invoke({
             "question": question,
             "schema_info": self.schema_info,
             "common_analyses": json.dumps(self.common_analyses)
@@ -122,34 +143,39 @@ class QueryHandler:
     def process_question(
         self,
         question: str,
-        db_handler: Any
+        db_handler: Any,
+        sql_query: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Process a natural language question and return results"""
+        """Process a natural language question and return results, reusing sql_query if already generated"""
         
         try:
             # Convert question to SQL
-            sql_query = self.convert_to_sql(question)
+            if sql_query is None:
+                sql_query = self.convert_to_sql(question)
             
             # Execute query
             df = db_handler.execute_query(sql_query)
             
+            # Materialize the rows once and share them between result and raw_data
+            records = frame_to_records(df)
+            
             # Format the results
             if len(df) == 1 and len(df.columns) == 1:
                 # Single value result
-                result = df.iloc[0, 0]
+                result = records[0][df.columns[0]]
                 return {
                     "question": question,
                     "sql_query": sql_query,
                     "result": result,
-                    "raw_data": df.to_dict(orient="records")
+                    "raw_data": records
                 }
             else:
                 # Multiple rows or columns
                 return {
                     "question": question,
                     "sql_query": sql_query,
-                    "result": df.to_dict(orient="records"),
-                    "raw_data": df.to_dict(orient="records")
+                    "result": records,
+                    "raw_data": records
                 }
                 
         except Exception as e:
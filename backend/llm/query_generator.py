@@ -1,17 +1,24 @@
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 from langchain.output_parsers import PydanticOutputParser
+from langchain.schema import HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
 import os
 from dotenv import load_dotenv
-import time
+import asyncio
+import random
 from groq import InternalServerError, RateLimitError, BadRequestError
 import logging
 import json
 import re
+import hashlib
+import threading
+import functools
+from collections import OrderedDict
 from .visualization_generator import VisualizationGenerator
-import rapidfuzz
+from rapidfuzz import fuzz, process
+from rapidfuzz.utils import default_process
 
 load_dotenv()
 
@@ -19,67 +26,158 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class SQLQuery(BaseModel):
-    query: str = Field(description="The generated SQL query")
-    explanation: str = Field(description="Explanation of what the query does")
-    summary: Optional[str] = Field(default="", description="Formal response for the frontend")
-
-class QueryGenerator:
-    def __init__(self, max_retries=3, retry_delay=1):
-        self.llm = ChatGroq(
-            api_key=os.getenv("GROQ_API_KEY"),
-            model_name="llama-3.3-70b-versatile",
-            temperature=0.1,
-            max_tokens=1024
-        )
-        self.parser = PydanticOutputParser(pydantic_object=SQLQuery)
-        self.max_retries = max_retries
-        self.retry_delay = retry_delay
-        self.viz_generator = VisualizationGenerator()
-        
-        # Define data analysis keywords that indicate valid questions
-        self.data_analysis_keywords = {
-            # Query-related
-            'show', 'what', 'how', 'calculate', 'find', 'list', 'get', 'display',
-            'count', 'sum', 'average', 'min', 'max', 'total', 'group', 'sort',
-            'filter', 'where', 'top', 'bottom', 'trend', 'compare', 'analyze',
-            'distribution', 'correlation', 'percentage', 'ratio', 'which', 'highest',
-            'most', 'best', 'lowest', 'least', 'worst', 'city', 'state', 'region',
-            'location', 'category', 'product', 'customer', 'sales', 'revenue',
-            'amount', 'value', 'price', 'cost', 'quantity', 'volume', 'count',
-            'number', 'units', 'date', 'time', 'period', 'month', 'year', 'day',
-            # SQL-specific
-            'select', 'from', 'where', 'group by', 'order by', 'join', 'having',
-            'distinct', 'limit', 'offset', 'case', 'when', 'then', 'else', 'end',
-            # Data analysis
-            'data', 'dataset', 'table', 'column', 'row', 'record', 'value',
-            'statistics', 'stats', 'metric', 'measure', 'dimension', 'aggregate',
-            'query', 'report', 'analysis', 'insight', 'pattern', 'trend',
-            # Additional variations for top/bottom queries
-            'first', 'last', 'beginning', 'end', 'start', 'begin', 'initial'
-        }
-
-        # Define common greetings and their responses
-        self.greetings = {
-            'hello': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-            'hi': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-            'hey': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-            'good morning': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-            'good afternoon': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-            'good evening': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-            'good night': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
-        }
-
-        # Define operation-related keywords and their responses
-        self.operation_keywords = {
-            'operation', 'operations', 'can do', 'capabilities', 'features', 'functions',
-            'what can you', 'how can you', 'abilities', 'perform', 'support', 'available',
-            'possible', 'types of', 'kinds of', 'examples of', 'show me what'
-        }
-
-        # Define help-related keywords and their responses
-        self.help_responses = {
-            'help': """I can help you analyze any dataset in many ways! Here are some examples of what you can ask me:
+# Maximum number of generated SQL answers kept in the query cache
+QUERY_CACHE_SIZE = 1024
+
+# Upper bound on concurrent Groq calls when /api/chat_batch answers several messages together;
+# keeps bursts under the per-key request rate limit
+MAX_CONCURRENT_LLM_CALLS = 4
+
+# Seconds the startup warm-up call may take before it is abandoned
+WARMUP_TIMEOUT = 10
+
+# Maximum number of distinct table schemas whose system prompt is memoized
+SYSTEM_PROMPT_CACHE_SIZE = 64
+
+def _schema_fingerprint(table_schema: Optional[Dict[str, Any]]) -> str:
+    """Stable hash of a table schema, so cached queries are invalidated when the schema changes."""
+    return hashlib.sha1(json.dumps(table_schema, sort_keys=True, default=str).encode()).hexdigest()
+
+def _token_sort(text: str) -> str:
+    """default_process the text (lowercase, punctuation to spaces, trim) and sort its tokens, as fuzz.token_sort_ratio does."""
+    return ' '.join(sorted(default_process(text).split()))
+
+def _within_ratio_reach(query: str, max_choice_len: int, cutoff: float = 80) -> bool:
+    """False when query is too long for fuzz.ratio against any choice of length <= max_choice_len to reach cutoff.
+
+    ratio is at most 200 * shorter / (len(a) + len(b)), so longer queries can be rejected without scoring.
+    """
+    return 200 * max_choice_len >= cutoff * (len(query) + max_choice_len)
+
+def _trie_pattern(node: Dict[str, Any]) -> str:
+    """Regex for the phrases below a character-trie node; the '' key marks the end of a phrase."""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        pattern = (pattern if len(branches) > 1 else '(?:' + pattern + ')') + '?'
+    return pattern
+
+def _compile_alternation(phrases) -> re.Pattern:
+    """Compile literal phrases into a single prefix-factored regex alternation.
+
+    Phrases sharing a prefix share one branch of a character trie, so each position of the
+    message is tested against every keyword in one pass instead of once per keyword.
+    """
+    trie: Dict[str, Any] = {}
+    for phrase in phrases:
+        node = trie
+        for char in phrase:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return re.compile(_trie_pattern(trie))
+
+# Question prefixes that indicate general knowledge rather than data analysis
+GENERAL_KNOWLEDGE_PREFIXES = (
+    'what is ', 'tell me about ', 'explain ', 'define ', 'describe ', 'how does ', 'what are ',
+    'what do you know about ', 'can you explain ', 'what does '
+)
+
+# Phrases that indicate a data analysis question anywhere in the message
+DATA_ANALYSIS_PHRASE_RE = _compile_alternation([
+    'show me', 'display', 'list', 'find', 'calculate', 'compute', 'analyze',
+    'compare', 'what is the', 'how many', 'what are the', 'what is the average',
+    'what is the total', 'what is the sum', 'what is the count', 'what is the maximum',
+    'what is the minimum', 'group by', 'filter', 'sort', 'order by'
+])
+
+# Data analysis keywords that indicate valid questions
+DATA_ANALYSIS_KEYWORDS = frozenset({
+    # Query-related
+    'show', 'what', 'how', 'calculate', 'find', 'list', 'get', 'display',
+    'count', 'sum', 'average', 'min', 'max', 'total', 'group', 'sort',
+    'filter', 'where', 'top', 'bottom', 'trend', 'compare', 'analyze',
+    'distribution', 'correlation', 'percentage', 'ratio', 'which', 'highest',
+    'most', 'best', 'lowest', 'least', 'worst', 'city', 'state', 'region',
+    'location', 'category', 'product', 'customer', 'sales', 'revenue',
+    'amount', 'value', 'price', 'cost', 'quantity', 'volume', 'count',
+    'number', 'units', 'date', 'time', 'period', 'month', 'year', 'day',
+    # SQL-specific
+    'select', 'from', 'where', 'group by', 'order by', 'join', 'having',
+    'distinct', 'limit', 'offset', 'case', 'when', 'then', 'else', 'end',
+    # Data analysis
+    'data', 'dataset', 'table', 'column', 'row', 'record', 'value',
+    'statistics', 'stats', 'metric', 'measure', 'dimension', 'aggregate',
+    'query', 'report', 'analysis', 'insight', 'pattern', 'trend',
+    # Additional variations for top/bottom queries
+    'first', 'last', 'beginning', 'end', 'start', 'begin', 'initial'
+})
+
+# Single-word keywords that mark a question as data analysis in is_data_analysis_question
+_QUESTION_KEYWORDS = frozenset({
+    'average', 'sum', 'count', 'total', 'maximum', 'minimum',
+    'group', 'filter', 'sort', 'order', 'compare', 'analyze',
+    'show', 'display', 'list', 'find', 'calculate', 'compute',
+    'top', 'bottom', 'highest', 'lowest', 'most', 'least'
+})
+
+# Common greeting/small talk phrases for fuzzy matching, de-duplicated (order-preserving) at load
+GREETING_PHRASES = tuple(dict.fromkeys([
+    'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening', 'good night',
+    "what's up", 'whats up', 'sup', 'yo', 'how are you', 'how is it going', 'how are things',
+    'howdy', 'greetings', 'hiya', 'hey there', 'hello there', 'how are you doing',
+    'how goes it', 'how you doing', 'how are ya', 'how is everything', 'how is life',
+    'how is your day', 'how is your day going', 'how is your day today', 'how is your evening',
+    'how is your morning', 'how is your afternoon', 'how is your night', 'how is your week',
+    'how is your weekend', 'how is your day been', 'how is your week been', 'how is your weekend been',
+    'how is your day going so far', 'how is your week going', 'how is your weekend going',
+    'how is your day so far', 'how is your week so far', 'how is your weekend so far',
+    'how is your day today', 'how is your week today', 'how is your weekend today',
+    'how is your day going today', 'how is your week going today', 'how is your weekend going today',
+    'how is your day been today', 'how is your week been today', 'how is your weekend been today',
+    'how is your day going so far today', 'how is your week going so far today', 'how is your weekend going so far today',
+    'how is your day so far today', 'how is your week so far today', 'how is your weekend so far today',
+    'how is your day today', 'how is your week today', 'how is your weekend today',
+    'how is your day going today', 'how is your week going today', 'how is your weekend going today',
+    'how is your day been today', 'how is your week been today', 'how is your weekend been today',
+    'how is your day going so far today', 'how is your week going so far today', 'how is your weekend going so far today',
+    'how is your day so far today', 'how is your week so far today', 'how is your weekend so far today',
+    'yo', 'sup', 'wassup', 'what up', 'what is up', 'whats good', 'what is good', 'how goes it',
+    'how are things', 'how is it going', 'how are you doing', 'how are you', 'how you doing',
+    'how are ya', 'how is everything', 'how is life', 'how is your day', 'how is your day going',
+    'how is your evening', 'how is your morning', 'how is your afternoon', 'how is your night',
+    'how is your week', 'how is your weekend', 'how is your day been', 'how is your week been',
+    'how is your weekend been', 'how is your day going so far', 'how is your week going',
+    'how is your weekend going', 'how is your day so far', 'how is your week so far',
+    'how is your weekend so far', 'howdy', 'hiya', 'greetings', 'hey there', 'hello there'
+]))
+GREETING_EXACT = frozenset(GREETING_PHRASES)
+# Greeting phrases run through default_process once, so each fuzzy lookup only processes the message
+GREETING_PHRASES_PROCESSED = tuple(default_process(phrase) for phrase in GREETING_PHRASES)
+GREETING_MAX_LEN = max(map(len, GREETING_PHRASES_PROCESSED))
+
+# Define common greetings and their responses
+GREETINGS = {
+    'hello': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+    'hi': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+    'hey': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+    'good morning': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+    'good afternoon': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+    'good evening': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+    'good night': 'Hi there! I\'m here to help you understand your data. What would you like to know?',
+}
+
+# Define operation-related keywords and their responses
+OPERATION_KEYWORDS = {
+    'operation', 'operations', 'can do', 'capabilities', 'features', 'functions',
+    'what can you', 'how can you', 'abilities', 'perform', 'support', 'available',
+    'possible', 'types of', 'kinds of', 'examples of', 'show me what'
+}
+
+# Define help-related keywords and their responses
+HELP_RESPONSES = {
+    'help': """I can help you analyze any dataset in many ways! Here are some examples of what you can ask me:
 
 1. Basic Analysis:
    - "Show me the first 10 rows of the data"
@@ -107,7 +205,7 @@ class QueryGenerator:
    - "Find outliers in the data"
 
 Would you like to explore any of these areas? Just ask me a question!""",
-            'what can you do': """I'm your AI Data Analytics Assistant, and I can help you understand any dataset through various analyses:
+    'what can you do': """I'm your AI Data Analytics Assistant, and I can help you understand any dataset through various analyses:
 
 • Basic Data Exploration: View data, unique values, and basic statistics
 • Aggregations: Calculate sums, averages, counts, and other aggregations
@@ -117,7 +215,7 @@ Would you like to explore any of these areas? Just ask me a question!""",
 • Custom Reports: Create specific analyses based on your needs
 
 What aspect of your data would you like to explore?""",
-            'how to use': """To use me effectively, simply ask questions about your data in natural language. For example:
+    'how to use': """To use me effectively, simply ask questions about your data in natural language. For example:
 
 1. For basic analysis:
    - "Show me the first 10 rows"
@@ -135,42 +233,11 @@ What aspect of your data would you like to explore?""",
    - "Filter for specific conditions"
 
 You can also ask for help at any time by typing "help" or "what can you do"!"""
-        }
-
-        # List of common greeting/small talk phrases for fuzzy matching
-        self.greeting_phrases = [
-            'hi', 'hello', 'hey', 'good morning', 'good afternoon', 'good evening', 'good night',
-            "what's up", 'whats up', 'sup', 'yo', 'how are you', 'how is it going', 'how are things',
-            'howdy', 'greetings', 'hiya', 'hey there', 'hello there', 'how are you doing',
-            'how goes it', 'how you doing', 'how are ya', 'how is everything', 'how is life',
-            'how is your day', 'how is your day going', 'how is your day today', 'how is your evening',
-            'how is your morning', 'how is your afternoon', 'how is your night', 'how is your week',
-            'how is your weekend', 'how is your day been', 'how is your week been', 'how is your weekend been',
-            'how is your day going so far', 'how is your week going', 'how is your weekend going',
-            'how is your day so far', 'how is your week so far', 'how is your weekend so far',
-            'how is your day today', 'how is your week today', 'how is your weekend today',
-            'how is your day going today', 'how is your week going today', 'how is your weekend going today',
-            'how is your day been today', 'how is your week been today', 'how is your weekend been today',
-            'how is your day going so far today', 'how is your week going so far today', 'how is your weekend going so far today',
-            'how is your day so far today', 'how is your week so far today', 'how is your weekend so far today',
-            'how is your day today', 'how is your week today', 'how is your weekend today',
-            'how is your day going today', 'how is your week going today', 'how is your weekend going today',
-            'how is your day been today', 'how is your week been today', 'how is your weekend been today',
-            'how is your day going so far today', 'how is your week going so far today', 'how is your weekend going so far today',
-            'how is your day so far today', 'how is your week so far today', 'how is your weekend so far today',
-            'yo', 'sup', 'wassup', 'what up', 'what is up', 'whats good', 'what is good', 'how goes it',
-            'how are things', 'how is it going', 'how are you doing', 'how are you', 'how you doing',
-            'how are ya', 'how is everything', 'how is life', 'how is your day', 'how is your day going',
-            'how is your evening', 'how is your morning', 'how is your afternoon', 'how is your night',
-            'how is your week', 'how is your weekend', 'how is your day been', 'how is your week been',
-            'how is your weekend been', 'how is your day going so far', 'how is your week going',
-            'how is your weekend going', 'how is your day so far', 'how is your week so far',
-            'how is your weekend so far', 'howdy', 'hiya', 'greetings', 'hey there', 'hello there'
-        ]
-
-        # Define knowledge base for common questions
-        self.knowledge_base = {
-            "what is python": """Python is a high-level, interpreted programming language known for its simplicity and readability. It was created by Guido van Rossum and first released in 1991. Python is widely used for:
+}
+
+# Define knowledge base for common questions
+KNOWLEDGE_BASE = {
+    "what is python": """Python is a high-level, interpreted programming language known for its simplicity and readability. It was created by Guido van Rossum and first released in 1991. Python is widely used for:
 • Web Development
 • Data Science and Machine Learning
 • Artificial Intelligence
@@ -185,7 +252,7 @@ Key features of Python include:
 • Strong community support
 • Rich ecosystem of packages and frameworks""",
 
-            "what is data": """Data refers to raw facts, figures, or information that can be processed, analyzed, and used to make decisions. In computing, data can be:
+    "what is data": """Data refers to raw facts, figures, or information that can be processed, analyzed, and used to make decisions. In computing, data can be:
 • Structured (databases, spreadsheets)
 • Unstructured (text, images, videos)
 • Semi-structured (XML, JSON)
@@ -197,7 +264,7 @@ Types of data include:
 • Temporal data (dates, times)
 • Spatial data (locations, coordinates)""",
 
-            "what is data science": """Data Science is an interdisciplinary field that combines:
+    "what is data science": """Data Science is an interdisciplinary field that combines:
 • Statistics
 • Computer Science
 • Domain Knowledge
@@ -221,7 +288,7 @@ Common tools and technologies:
 • Power BI
 • TensorFlow/PyTorch""",
 
-            "what is machine learning": """Machine Learning is a subset of artificial intelligence that enables systems to learn and improve from experience without being explicitly programmed. Key concepts include:
+    "what is machine learning": """Machine Learning is a subset of artificial intelligence that enables systems to learn and improve from experience without being explicitly programmed. Key concepts include:
 
 • Supervised Learning
   - Classification
@@ -238,7 +305,7 @@ Common applications:
 • Fraud Detection
 • Autonomous Vehicles""",
 
-            "what is artificial intelligence": """Artificial Intelligence (AI) is the simulation of human intelligence by machines. It encompasses:
+    "what is artificial intelligence": """Artificial Intelligence (AI) is the simulation of human intelligence by machines. It encompasses:
 
 • Machine Learning
 • Deep Learning
@@ -259,7 +326,7 @@ Applications:
 • Financial Analysis
 • Smart Home Devices""",
 
-            "what is big data": """Big Data refers to extremely large and complex datasets that traditional data processing methods cannot handle effectively. Characteristics:
+    "what is big data": """Big Data refers to extremely large and complex datasets that traditional data processing methods cannot handle effectively. Characteristics:
 
 • Volume (large amounts of data)
 • Velocity (high-speed data generation)
@@ -280,40 +347,191 @@ Applications:
 • Healthcare
 • Social Media Analysis
 • IoT Data Processing"""
-        }
-
-        # Define patterns for knowledge base questions
-        self.knowledge_base_phrases = [
-            "what is python",
-            "what is data",
-            "what is data science",
-            "what is machine learning",
-            "what is artificial intelligence",
-            "what is big data",
-            "explain python",
-            "explain data",
-            "explain data science",
-            "explain machine learning",
-            "explain artificial intelligence",
-            "explain big data",
-            "tell me about python",
-            "tell me about data",
-            "tell me about data science",
-            "tell me about machine learning",
-            "tell me about artificial intelligence",
-            "tell me about big data"
-        ]
-
-        # Define common patterns for top/bottom queries
-        self.top_bottom_patterns = [
-            r'show\s+(?:the\s+)?(?:top|first|beginning|start|initial)\s+(\d+)',
-            r'show\s+(?:the\s+)?(?:bottom|last|end)\s+(\d+)',
-            r'(?:top|first|beginning|start|initial)\s+(\d+)',
-            r'(?:bottom|last|end)\s+(\d+)'
-        ]
+}
+
+# Define patterns for knowledge base questions
+KNOWLEDGE_BASE_PHRASES = [
+    "what is python",
+    "what is data",
+    "what is data science",
+    "what is machine learning",
+    "what is artificial intelligence",
+    "what is big data",
+    "explain python",
+    "explain data",
+    "explain data science",
+    "explain machine learning",
+    "explain artificial intelligence",
+    "explain big data",
+    "tell me about python",
+    "tell me about data",
+    "tell me about data science",
+    "tell me about machine learning",
+    "tell me about artificial intelligence",
+    "tell me about big data"
+]
+KNOWLEDGE_BASE_PHRASE_SET = frozenset(KNOWLEDGE_BASE_PHRASES)
+
+# Define common patterns for top/bottom queries
+TOP_BOTTOM_PATTERNS = [
+    r'show\s+(?:the\s+)?(?:top|first|beginning|start|initial)\s+(\d+)',
+    r'show\s+(?:the\s+)?(?:bottom|last|end)\s+(\d+)',
+    r'(?:top|first|beginning|start|initial)\s+(\d+)',
+    r'(?:bottom|last|end)\s+(\d+)'
+]
+
+class SQLQuery(BaseModel):
+    query: str = Field(description="The generated SQL query")
+    explanation: str = Field(description="Explanation of what the query does")
+    summary: Optional[str] = Field(default="", description="Formal response for the frontend")
+
+# Explanation formatting applied to every generated SQL answer
+TRENDS_PLEASE_ASK_RE = re.compile(r'(trends)( Please ask me)')
+NUMBERED_ITEM_RE = re.compile(r'(?<!\n)(\d+\.)')
+EXTRA_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Frontend summary for a generated query: the first rule whose token appears in the lowercased SQL wins
+FORMAL_RESPONSES = (
+    ('limit 5', "Here are the top 5 records from your analysis."),
+    ('limit 10', "Here are the top 10 records from your analysis."),
+    ('count', "Here is the count from your analysis."),
+    ('sum', "Here is the sum from your analysis."),
+    ('avg', "Here is the average from your analysis."),
+)
+
+# Fallback responses returned by agenerate_query
+GENERAL_KNOWLEDGE_ERROR = SQLQuery(
+    query="SELECT 'error' as response",
+    explanation="I apologize, but I'm having trouble processing your question. Could you please rephrase it or try asking about data analysis instead."
+)
+DEFAULT_PREVIEW_QUERY = SQLQuery(
+    query="SELECT * FROM current_dataset LIMIT 5",
+    explanation="Here are the top 5 rows from your dataset.",
+    summary="Showing top 5 rows"
+)
+GENERATION_ERROR = SQLQuery(
+    query="SELECT 'error' as type",
+    explanation="I apologize, but I encountered an error while processing your request. Please try again or rephrase your question."
+)
+
+@functools.lru_cache(maxsize=512)
+def _classify_query(query: str) -> Optional[str]:
+    """Classify SQL as 'aggregate', 'time_series' or None from its keywords, uppercasing it once."""
+    query_upper = query.upper()
+    if "COUNT" in query_upper or "GROUP BY" in query_upper:
+        return "aggregate"
+    if "DATE" in query_upper or "MONTH" in query_upper or "YEAR" in query_upper:
+        return "time_series"
+    return None
+
+@functools.lru_cache(maxsize=512)
+def _visualization_type(query: str, n_rows: int, value_types: Tuple[type, ...]) -> str:
+    """Pick a visualization from the query kind, row count (capped at 6) and first-row value types."""
+    query_kind = _classify_query(query)
+        
+    # Check for aggregation queries
+    if query_kind == "aggregate":
+        if n_rows <= 5:
+            return "pie"
+        return "bar"
+        
+    # Check for time series data
+    if query_kind == "time_series":
+        return "line"
+        
+    # Check for correlation/scatter plot potential
+    if len(value_types) >= 2 and all(issubclass(value_type, (int, float)) for value_type in value_types):
+        return "scatter"
+        
+    # Default to table view
+    return "table"
+
+class QueryGenerator:
+    def __init__(self, max_retries=3, retry_delay=1, max_retry_delay=30):
+        # The Groq client and visualization generator are built on first use, so
+        # greeting/KB/help answers never pay for client setup
+        self._llm: Optional[ChatGroq] = None
+        self._viz_generator: Optional[VisualizationGenerator] = None
+        self.parser = PydanticOutputParser(pydantic_object=SQLQuery)
+        # The parser's JSON schema instructions never change, so introspect the model once
+        self._format_instructions = self.parser.get_format_instructions()
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        # Prompt for questions outside data analysis, built once and formatted per call
+        self._general_knowledge_prompt = ChatPromptTemplate.from_messages([
+            ("system", """You are a helpful AI assistant with expertise in technology, programming, and data science.\nUse the conversation history to resolve pronouns and follow-up questions.\nProvide clear, accurate, and concise answers to questions.\nIf you're not sure about something, say so.\nFormat your response with bullet points for better readability.\nFocus on providing factual information and avoid making assumptions."""),
+            ("human", """Conversation History:\n{history}\nCurrent Question: {question}""")
+        ])
+        # LRU of generated SQL keyed by (question, table_name, schema fingerprint)
+        self._query_cache: "OrderedDict[Tuple[str, str, str], SQLQuery]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+        # System prompts keyed by (table_name, column name/type pairs)
+        self._system_prompt_cache = functools.lru_cache(maxsize=SYSTEM_PROMPT_CACHE_SIZE)(self._build_system_prompt)
+        
+        # Static vocabularies and responses are module-level constants shared by every instance
+        self.data_analysis_keywords = DATA_ANALYSIS_KEYWORDS
+        self.greetings = GREETINGS
+        self.operation_keywords = OPERATION_KEYWORDS
+        self.help_responses = HELP_RESPONSES
+        self.greeting_phrases = GREETING_PHRASES
+        self.knowledge_base = KNOWLEDGE_BASE
+        self.knowledge_base_phrases = KNOWLEDGE_BASE_PHRASES
+        self.top_bottom_patterns = TOP_BOTTOM_PATTERNS
+
+        # Sequence of knowledge base topics for fuzzy matching (a dict would be scored by value)
+        self._knowledge_base_keys = tuple(self.knowledge_base)
+        # Token-sorted forms of the static phrases/topics, so each lookup only sorts the query
+        self._kb_phrases_sorted = [_token_sort(phrase) for phrase in self.knowledge_base_phrases]
+        self._kb_keys_sorted = [_token_sort(key) for key in self._knowledge_base_keys]
+        self._kb_max_len = max(map(len, self._kb_phrases_sorted + self._kb_keys_sorted))
+
+        # Precompiled matchers so each classification is a single regex call
+        self._greeting_exact_re = re.compile(
+            r'^(?:' + '|'.join(re.escape(greeting) for greeting in self.greetings) + r')(?:\b|$)'
+        )
+        self._help_re = _compile_alternation(self.help_responses)
+        self._operation_re = _compile_alternation(self.operation_keywords)
+        # One anchored scan that reports the first matching intent in priority order:
+        # a leading greeting, then a help phrase anywhere, then an operation keyword anywhere
+        self._intent_re = re.compile(
+            r'(?P<greeting>' + self._greeting_exact_re.pattern[1:] + r')'
+            r'|(?=.*?(?P<help>' + self._help_re.pattern + r'))'
+            r'|(?=.*?(?P<operation>' + self._operation_re.pattern + r'))',
+            re.DOTALL
+        )
+        self._top_bottom_re = re.compile('|'.join(f'(?:{pattern})' for pattern in self.top_bottom_patterns))
+
+    @property
+    def llm(self) -> ChatGroq:
+        """Groq chat model, created on first access."""
+        if self._llm is None:
+            self._llm = ChatGroq(
+                api_key=os.getenv("GROQ_API_KEY"),
+                model_name="llama-3.3-70b-versatile",
+                temperature=0.1,
+                max_tokens=1024
+            )
+        return self._llm
+
+    @property
+    def viz_generator(self) -> VisualizationGenerator:
+        """Visualization generator, created on first access."""
+        if self._viz_generator is None:
+            self._viz_generator = VisualizationGenerator()
+        return self._viz_generator
 
     def _get_system_prompt(self, table_name: Optional[str] = None, table_schema: Optional[Dict[str, Any]] = None) -> str:
-        """Generate system prompt based on table schema."""
+        """Generate system prompt based on table schema, reusing the prompt built for an identical schema."""
+        schema_key = tuple((col['name'], col['type']) for col in table_schema['columns']) if table_schema else None
+        return self._system_prompt_cache(table_name, schema_key)
+
+    def _build_system_prompt(self, table_name: Optional[str], schema_key: Optional[Tuple[Tuple[str, str], ...]]) -> str:
+        """Build the system prompt for a table from its (name, type) column pairs.
+
+        The instructions and format instructions come first and the table schema last, so every
+        request shares the longest possible identical prefix for Groq's prompt caching.
+        """
         base_prompt = """You are a professional AI Data Analytics Assistant that helps users analyze their data through natural language queries.
 
 Guidelines:
@@ -338,130 +556,126 @@ If the user's question is not related to data analysis, politely explain that yo
 {format_instructions}
 """
 
-        if table_name and table_schema:
+        base_prompt = base_prompt.replace("{format_instructions}", self._format_instructions)
+
+        if table_name and schema_key:
             schema_description = f"\nTable Schema for '{table_name}':\n"
-            for col in table_schema['columns']:
-                schema_description += f"- {col['name']} ({col['type']})\n"
-            base_prompt = base_prompt.replace("Guidelines:", f"{schema_description}\nGuidelines:")
+            for name, col_type in schema_key:
+                schema_description += f"- {name} ({col_type})\n"
+            base_prompt += schema_description
 
         return base_prompt
 
+    @staticmethod
+    def _query_cache_key(question: str, table_name: str, table_schema: Optional[Dict[str, Any]]) -> Tuple[str, str, str]:
+        """Cache key for a question against a table schema.
+
+        Only whitespace and trailing '?'/'!' are normalized; operators, digits, '%', '-' and
+        letter case can all change the generated SQL (e.g. "price > 100" vs "price < 100",
+        "city is Paris" vs "city is paris"), so they are kept as typed.
+        """
+        normalized = " ".join(question.split()).rstrip("?! ")
+        return (normalized, table_name, _schema_fingerprint(table_schema))
+
+    def _get_cached_query(self, key: Tuple[str, str, str]) -> Optional[SQLQuery]:
+        """Return the SQLQuery cached under key, marking it most recently used."""
+        with self._query_cache_lock:
+            cached = self._query_cache.get(key)
+            if cached is not None:
+                self._query_cache.move_to_end(key)
+            return cached
+
+    def _cache_query(self, key: Tuple[str, str, str], sql_query: SQLQuery) -> None:
+        """Store a generated SQLQuery, evicting the least recently used entries when full."""
+        with self._query_cache_lock:
+            self._query_cache[key] = sql_query
+            self._query_cache.move_to_end(key)
+            while len(self._query_cache) > QUERY_CACHE_SIZE:
+                self._query_cache.popitem(last=False)
+
+    def _backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff capped at max_retry_delay, plus up to 1s of jitter to spread retries."""
+        return min(self.max_retry_delay, self.retry_delay * (2 ** (attempt - 1))) + random.random()
+
     def _handle_groq_error(self, error, attempt):
-        """Handle different types of Groq API errors."""
+        """Handle different types of Groq API errors; returns True if the call should be retried after backing off."""
         if isinstance(error, InternalServerError):
             logger.warning(f"Groq service unavailable (attempt {attempt}/{self.max_retries}). Retrying...")
-            return True  # Retry
         elif isinstance(error, RateLimitError):
             logger.warning(f"Rate limit exceeded (attempt {attempt}/{self.max_retries}). Retrying...")
-            time.sleep(self.retry_delay * 2)  # Double the delay for rate limits
-            return True  # Retry
         elif isinstance(error, BadRequestError):
             logger.error(f"Bad request to Groq API: {str(error)}")
             return False  # Don't retry
         else:
             logger.error(f"Unexpected error from Groq API: {str(error)}")
             return False  # Don't retry
+        return True  # Retry
         
-    def is_greeting(self, message: str) -> bool:
+    def is_greeting(self, message: str, normalized: Optional[str] = None) -> bool:
         """Check if the message is a greeting or small talk using fuzzy matching."""
-        message_lower = message.lower().strip()
+        message_lower = normalized if normalized is not None else message.lower().strip()
         # First, check exact match with the original greetings
-        for greeting in self.greetings.keys():
-            pattern = r'^' + re.escape(greeting) + r'(\b|$)'
-            if re.match(pattern, message_lower):
-                return True
-        # Fuzzy match with greeting phrases
-        for phrase in self.greeting_phrases:
-            score = rapidfuzz.fuzz.ratio(message_lower, phrase)
-            if score >= 80:
-                return True
-        return False
-
-    def is_help_request(self, message: str) -> bool:
+        if message_lower in GREETING_EXACT or self._greeting_exact_re.match(message_lower):
+            return True
+        return self._is_fuzzy_greeting(message_lower)
+
+    def _is_fuzzy_greeting(self, message_lower: str) -> bool:
+        """Fuzzy match with greeting phrases, unless the message is too long to score 80+ against any of them."""
+        message_processed = default_process(message_lower)
+        if not _within_ratio_reach(message_processed, GREETING_MAX_LEN):
+            return False
+        match = process.extractOne(message_processed, GREETING_PHRASES_PROCESSED, scorer=fuzz.ratio, score_cutoff=80)
+        return match is not None
+
+    def _classify_intent(self, message_lower: str) -> Optional[str]:
+        """Return 'greeting', 'help' or 'operation' for a normalized message, or None.
+
+        Equivalent to trying is_greeting, is_help_request and is_operation_question in turn,
+        with a single regex scan in place of the three keyword searches.
+        """
+        if message_lower in GREETING_EXACT:
+            return 'greeting'
+        match = self._intent_re.match(message_lower)
+        if match is not None and match.group('greeting') is not None:
+            return 'greeting'
+        if self._is_fuzzy_greeting(message_lower):
+            return 'greeting'
+        if match is None:
+            return None
+        return 'help' if match.group('help') is not None else 'operation'
+
+    def is_help_request(self, message: str, normalized: Optional[str] = None) -> bool:
         """Check if the message is a help request."""
-        message_lower = message.lower().strip()
-        return any(help_keyword in message_lower for help_keyword in self.help_responses.keys())
+        message_lower = normalized if normalized is not None else message.lower().strip()
+        return bool(self._help_re.search(message_lower))
 
-    def is_operation_question(self, message: str) -> bool:
+    def is_operation_question(self, message: str, normalized: Optional[str] = None) -> bool:
         """Check if the message is asking about operations or capabilities."""
-        message_lower = message.lower().strip()
-        return any(keyword in message_lower for keyword in self.operation_keywords)
+        message_lower = normalized if normalized is not None else message.lower().strip()
+        return bool(self._operation_re.search(message_lower))
 
-    def is_data_analysis_question(self, question: str) -> bool:
+    def is_data_analysis_question(self, question: str, normalized: Optional[str] = None) -> bool:
         """Check if the question is related to data analysis."""
-        question_lower = question.lower()
+        question_lower = normalized if normalized is not None else question.lower().strip()
         
         # First check if it's a general knowledge question
-        if self.is_knowledge_base_question(question_lower):
+        if self.is_knowledge_base_question(question, normalized=question_lower):
             return False
             
         # Check for common general knowledge question patterns
-        general_knowledge_patterns = [
-            r'^what is\s+',
-            r'^tell me about\s+',
-            r'^explain\s+',
-            r'^define\s+',
-            r'^describe\s+',
-            r'^how does\s+',
-            r'^what are\s+',
-            r'^what do you know about\s+',
-            r'^can you explain\s+',
-            r'^what does\s+'
-        ]
-        
-        for pattern in general_knowledge_patterns:
-            if re.match(pattern, question_lower):
-                return False
-        
-        # Check for data analysis specific patterns
-        data_analysis_patterns = [
-            r'show me',
-            r'display',
-            r'list',
-            r'find',
-            r'calculate',
-            r'compute',
-            r'analyze',
-            r'compare',
-            r'what is the',
-            r'how many',
-            r'what are the',
-            r'what is the average',
-            r'what is the total',
-            r'what is the sum',
-            r'what is the count',
-            r'what is the maximum',
-            r'what is the minimum',
-            r'group by',
-            r'filter',
-            r'sort',
-            r'order by'
-        ]
-        
-        # Check for data analysis keywords
-        words = question_lower.split()
-        data_analysis_keywords = {
-            'average', 'sum', 'count', 'total', 'maximum', 'minimum',
-            'group', 'filter', 'sort', 'order', 'compare', 'analyze',
-            'show', 'display', 'list', 'find', 'calculate', 'compute',
-            'top', 'bottom', 'highest', 'lowest', 'most', 'least'
-        }
+        if question_lower.startswith(GENERAL_KNOWLEDGE_PREFIXES):
+            return False
         
         # Check for data analysis patterns
-        for pattern in data_analysis_patterns:
-            if pattern in question_lower:
-                return True
+        if DATA_ANALYSIS_PHRASE_RE.search(question_lower):
+            return True
                 
-        # Check for data analysis keywords
-        if any(word in data_analysis_keywords for word in words):
+        # Check for data analysis keywords with a single set intersection over the tokens
+        if not _QUESTION_KEYWORDS.isdisjoint(question_lower.split()):
             return True
             
         # Check for top/bottom patterns
-        for pattern in self.top_bottom_patterns:
-            if re.search(pattern, question_lower):
-                return True
-                
-        return False
+        return bool(self._top_bottom_re.search(question_lower))
 
     def get_greeting_response(self, message: str) -> str:
         """Get appropriate greeting response (always the same for any greeting/small talk)."""
@@ -470,10 +684,10 @@ If the user's question is not related to data analysis, politely explain that yo
     def get_help_response(self, message: str) -> str:
         """Get appropriate help response."""
         message_lower = message.lower().strip()
-        for help_keyword, response in self.help_responses.items():
-            if help_keyword in message_lower:
-                return response
-        return self.help_responses['help']
+        # One regex scan collects every help keyword present; the first in dict order wins, as before
+        matched = set(self._help_re.findall(message_lower))
+        help_keyword = next((keyword for keyword in self.help_responses if keyword in matched), 'help')
+        return self.help_responses[help_keyword]
 
     def get_operation_response(self) -> str:
         """Get response for operation-related questions."""
@@ -517,40 +731,26 @@ To use any of these operations, simply ask a question about your data. For examp
 
 Type 'help' to see more examples!"""
 
-    def is_knowledge_base_question(self, message: str) -> str:
+    def is_knowledge_base_question(self, message: str, normalized: Optional[str] = None) -> str:
         """Check if the message is a knowledge base question using token-based fuzzy matching. Returns the best matched key or None."""
-        message_lower = message.lower().strip()
+        message_lower = normalized if normalized is not None else message.lower().strip()
         
         # First try exact match with knowledge base phrases
-        for phrase in self.knowledge_base_phrases:
-            if message_lower == phrase:
-                return phrase
-        
-        # Then try fuzzy matching with knowledge base phrases
-        best_score = 0
-        best_phrase = None
-        
-        for phrase in self.knowledge_base_phrases:
-            # Use token_sort_ratio for better matching regardless of word order
-            score = rapidfuzz.fuzz.token_sort_ratio(message_lower, phrase)
-            if score > best_score:
-                best_score = score
-                best_phrase = phrase
+        if message_lower in KNOWLEDGE_BASE_PHRASE_SET:
+            return message_lower
         
-        # If we have a good match (80% or higher similarity)
-        if best_score >= 80:
-            return best_phrase
-            
-        # If no good match found, try to match against knowledge base keys
-        for key in self.knowledge_base.keys():
-            score = rapidfuzz.fuzz.token_sort_ratio(message_lower, key)
-            if score > best_score:
-                best_score = score
-                best_phrase = key
-        
-        # Return the best match if it's good enough
-        if best_score >= 80:
-            return best_phrase
+        # Then try fuzzy matching with knowledge base phrases, then knowledge base keys.
+        # ratio over pre-sorted tokens equals token_sort_ratio (matches regardless of word order; 80%+ similarity)
+        query_sorted = _token_sort(message_lower)
+        if not _within_ratio_reach(query_sorted, self._kb_max_len):
+            return None
+        for choices, choices_sorted in (
+            (self.knowledge_base_phrases, self._kb_phrases_sorted),
+            (self._knowledge_base_keys, self._kb_keys_sorted)
+        ):
+            match = process.extractOne(query_sorted, choices_sorted, scorer=fuzz.ratio, score_cutoff=80)
+            if match is not None:
+                return choices[match[2]]
             
         return None
 
@@ -561,240 +761,269 @@ Type 'help' to see more examples!"""
             return self.knowledge_base[key]
             
         # Try fuzzy matching if exact match fails
-        best_score = 0
-        best_key = None
-        for kb_key in self.knowledge_base.keys():
-            score = rapidfuzz.fuzz.token_sort_ratio(key, kb_key)
-            if score > best_score:
-                best_score = score
-                best_key = kb_key
-                
-        if best_score >= 80 and best_key:
-            return self.knowledge_base[best_key]
+        match = process.extractOne(_token_sort(key), self._kb_keys_sorted, scorer=fuzz.ratio, score_cutoff=80)
+        if match is not None:
+            return self.knowledge_base[self._knowledge_base_keys[match[2]]]
             
         return "I'm sorry, I don't have information on that topic yet. I can help you with questions about Python, data, data science, machine learning, artificial intelligence, and big data."
 
-    def generate_query(self, question: str, table_name: Optional[str] = None, table_schema: Optional[Dict[str, Any]] = None, history: Optional[list] = None) -> SQLQuery:
-        """Generate SQL query from natural language question, using conversation history if provided."""
-        try:
-            # First check if it's a knowledge base question
-            kb_key = self.is_knowledge_base_question(question)
-            if kb_key:
-                return SQLQuery(
-                    query="SELECT 'knowledge_base' as response",
-                    explanation=self.get_knowledge_base_response(kb_key)
-                )
+    def _answer_without_llm(self, question: str, question_lower: str, table_name: Optional[str] = None) -> Optional[SQLQuery]:
+        """Answer knowledge base, greeting, help, operation, summary and data view requests without calling the LLM.
+
+        question_lower is question.lower().strip(), computed once by the caller and shared by every check.
+        """
+        # Cheapest checks first: an exact knowledge base phrase is a set lookup and the
+        # greeting/help/operation intents a single regex scan, so fuzzy knowledge base
+        # matching only runs when both miss
+        kb_key = question_lower if question_lower in KNOWLEDGE_BASE_PHRASE_SET else None
+        intent = None if kb_key else self._classify_intent(question_lower)
+        if not kb_key and intent is None:
+            kb_key = self.is_knowledge_base_question(question, normalized=question_lower)
+
+        # Check if it's a knowledge base question
+        if kb_key:
+            return SQLQuery(
+                query="SELECT 'knowledge_base' as response",
+                explanation=self.get_knowledge_base_response(kb_key)
+            )
 
-            # Check for greetings
-            if self.is_greeting(question):
-                return SQLQuery(
-                    query="SELECT 'greeting' as response",
-                    explanation=self.get_greeting_response(question)
-                )
+        # Check for greetings
+        if intent == 'greeting':
+            return SQLQuery(
+                query="SELECT 'greeting' as response",
+                explanation=self.get_greeting_response(question)
+            )
+
+        # Check for help requests
+        if intent == 'help':
+            return SQLQuery(
+                query="SELECT 'help' as response",
+                explanation=self.get_help_response(question)
+            )
+
+        # Check for operation questions
+        if intent == 'operation':
+            return SQLQuery(
+                query="SELECT 'operation' as response",
+                explanation=self.get_operation_response()
+            )
+        
+        # Keywords for summary and data view requests
+        summary_keywords = ['summary', 'summarize', 'explain', 'describe']
+        view_keywords = ['show', 'display', 'view']
+        data_keywords = ['data', 'dataset']
+
+        # Check for summary request (now triggers on any of these words)
+        is_summary_request = any(keyword in question_lower for keyword in summary_keywords)
+
+        # Check for data view request (and not a summary request)
+        is_data_view_request = (
+            any(keyword in question_lower for keyword in view_keywords) and
+            any(keyword in question_lower for keyword in data_keywords) and
+            not is_summary_request
+        )
 
-            # Check for help requests
-            if self.is_help_request(question):
+        if is_summary_request:
+            if not table_name:
                 return SQLQuery(
-                    query="SELECT 'help' as response",
-                    explanation=self.get_help_response(question)
+                    query="SELECT 'no_dataset' as type",
+                    explanation="I don't see any dataset available. Please upload a dataset first, and then I'll be happy to help you analyze it!",
+                    summary="No dataset available",
                 )
+            return SQLQuery(
+                query="SELECT 'dataset_summary' as type",
+                explanation="Generating a summary of the dataset...",
+                summary="Here is a summary of your dataset."
+            )
 
-            # Check for operation questions
-            if self.is_operation_question(question):
+        if is_data_view_request:
+            if not table_name:
                 return SQLQuery(
-                    query="SELECT 'operation' as response",
-                    explanation=self.get_operation_response()
+                    query="SELECT 'no_dataset' as type",
+                    explanation="I don't see any dataset available. Please upload a dataset first, and then I'll be happy to help you analyze it!",
+                    summary="No dataset available",
                 )
+            return SQLQuery(
+                query=f'SELECT * FROM "{table_name}" LIMIT 10',
+                explanation="Here are the first 10 rows of your dataset. This gives you a quick overview of the data's structure and content.",
+                summary="Showing the first 10 rows of the dataset."
+            )
 
-            question_lower = question.lower().strip()
-            
-            # Keywords for summary and data view requests
-            summary_keywords = ['summary', 'summarize', 'explain', 'describe']
-            view_keywords = ['show', 'display', 'view']
-            data_keywords = ['data', 'dataset']
-
-            # Check for summary request (now triggers on any of these words)
-            is_summary_request = any(keyword in question_lower for keyword in summary_keywords)
-
-            # Check for data view request (and not a summary request)
-            is_data_view_request = (
-                any(keyword in question_lower for keyword in view_keywords) and
-                any(keyword in question_lower for keyword in data_keywords) and
-                not is_summary_request
+        return None
+
+    def _general_knowledge_messages(self, question: str, history: Optional[list] = None) -> list:
+        """Format the general-knowledge prompt with the last five conversation turns."""
+        # Build conversation history string
+        history_str = ""
+        if history:
+            for turn in history[-5:]:
+                if turn.get('user'):
+                    history_str += f"User: {turn['user']}\n"
+                if turn.get('assistant'):
+                    history_str += f"Assistant: {turn['assistant']}\n"
+        return self._general_knowledge_prompt.format_messages(history=history_str, question=question)
+
+    def _sql_messages(self, question: str, table_name: str, table_schema: Optional[Dict[str, Any]] = None) -> list:
+        """Format the SQL-generation prompt for a data analysis question."""
+        # The system prompt (with table schema if available) is fully formatted and cached per
+        # schema; only the question changes between calls
+        system_prompt = self._get_system_prompt(table_name, table_schema)
+
+        logger.info(f"Processing question: {question}")
+        logger.info(f"Using table: {table_name}")
+        logger.info(f"Table schema: {json.dumps(table_schema, indent=2)}")
+
+        # Handle regular data analysis queries
+        return [SystemMessage(content=system_prompt), HumanMessage(content=question)]
+
+    def _build_sql_result(self, content: str) -> SQLQuery:
+        """Parse the LLM output and format it for the frontend."""
+        sql_query = self.parser.parse(content)
+        logger.info(f"Generated SQL Query: {sql_query.query}")
+        
+        # Format the explanation with proper spacing and structure
+        formatted_explanation = sql_query.explanation.strip()
+        if formatted_explanation:
+            # Add line breaks between sections
+            formatted_explanation = formatted_explanation.replace('. ', '.\n\n')
+            # Add a newline before 'Please ask me' for better separation
+            formatted_explanation = TRENDS_PLEASE_ASK_RE.sub(r'\1.\n\2', formatted_explanation)
+            # Ensure every bullet starts on a new line
+            formatted_explanation = formatted_explanation.replace('•', '\n•')
+            # Ensure every numbered list item starts on a new line
+            formatted_explanation = NUMBERED_ITEM_RE.sub(r'\n\1', formatted_explanation)
+            # Remove any double line breaks
+            formatted_explanation = EXTRA_BLANK_LINES_RE.sub('\n\n', formatted_explanation)
+        
+        # Create a formal response for the frontend
+        query_lower = sql_query.query.lower()
+        formal_response = next(
+            (response for token, response in FORMAL_RESPONSES if token in query_lower),
+            "Here are the results of your analysis."
+        )
+        
+        return SQLQuery(
+            query=sql_query.query,
+            explanation=formatted_explanation,  # This will be used for the info section
+            summary=formal_response  # This will be used for the main response
+        )
+
+    def _out_of_scope_or_raise(self, error: Exception) -> SQLQuery:
+        """Turn an unexpected generation error into an out-of-scope response, or re-raise it."""
+        logger.error(f"Unexpected error during query generation: {str(error)}")
+        # For out-of-scope questions, return a helpful response
+        if "cannot generate SQL" in str(error).lower():
+            return SQLQuery(
+                query="SELECT 'out_of_scope' as type",
+            explanation="""I'm having trouble understanding how to analyze your data with that question.
+
+I can help you with:
+• Basic data exploration (viewing data, unique values, basic stats)
+• Aggregations (sums, averages, counts)
+• Filtering and sorting
+• Time-based analysis (if date columns exist)
+• Statistical analysis (correlations, distributions)
+
+Try rephrasing your question to focus on analyzing the data, or type 'help' to see examples!"""
             )
+        raise error
 
-            if is_summary_request:
-                if not table_name:
-                    return SQLQuery(
-                        query="SELECT 'no_dataset' as type",
-                        explanation="I don't see any dataset available. Please upload a dataset first, and then I'll be happy to help you analyze it!",
-                        summary="No dataset available",
-                    )
-                return SQLQuery(
-                    query="SELECT 'dataset_summary' as type",
-                    explanation="Generating a summary of the dataset...",
-                    summary="Here is a summary of your dataset."
-                )
+    async def agenerate_query(self, question: str, table_name: Optional[str] = None, table_schema: Optional[Dict[str, Any]] = None, history: Optional[list] = None) -> SQLQuery:
+        """Generate SQL query from natural language question, using conversation history if provided.
 
-            if is_data_view_request:
-                if not table_name:
-                    return SQLQuery(
-                        query="SELECT 'no_dataset' as type",
-                        explanation="I don't see any dataset available. Please upload a dataset first, and then I'll be happy to help you analyze it!",
-                        summary="No dataset available",
-                    )
-                return SQLQuery(
-                    query=f'SELECT * FROM "{table_name}" LIMIT 10',
-                    explanation="Here are the first 10 rows of your dataset. This gives you a quick overview of the data's structure and content.",
-                    summary="Showing the first 10 rows of the dataset."
-                )
+        Groq calls go through ChatGroq.ainvoke, so concurrent requests overlap their round-trips;
+        Groq enforces per-key request and token rate limits, so large bursts will hit
+        RateLimitError and be retried with backoff.
+        """
+        try:
+            question_lower = question.lower().strip()
+            answer = self._answer_without_llm(question, question_lower, table_name)
+            if answer is not None:
+                return answer
 
             # If it's not a data analysis question, use LLM for general knowledge
-            if not self.is_data_analysis_question(question):
+            if not self.is_data_analysis_question(question, normalized=question_lower):
                 try:
-                    # Build conversation history string
-                    history_str = ""
-                    if history:
-                        for turn in history[-5:]:
-                            if turn.get('user'):
-                                history_str += f"User: {turn['user']}\n"
-                            if turn.get('assistant'):
-                                history_str += f"Assistant: {turn['assistant']}\n"
-                    prompt = ChatPromptTemplate.from_messages([
-                        ("system", """You are a helpful AI assistant with expertise in technology, programming, and data science.\nUse the conversation history to resolve pronouns and follow-up questions.\nProvide clear, accurate, and concise answers to questions.\nIf you're not sure about something, say so.\nFormat your response with bullet points for better readability.\nFocus on providing factual information and avoid making assumptions."""),
-                        ("human", f"""Conversation History:\n{history_str}\nCurrent Question: {{question}}""")
-                    ])
-                    prompt_msg = prompt.format_messages(question=question)
-                    response = self.llm.invoke(prompt_msg)
-                    answer = response.content.strip()
+                    response = await self.llm.ainvoke(self._general_knowledge_messages(question, history))
                     return SQLQuery(
                         query="SELECT 'general_knowledge' as response",
-                        explanation=answer
+                        explanation=response.content.strip()
                     )
                 except Exception as e:
                     logger.error(f"Error generating general knowledge response: {str(e)}")
-                    return SQLQuery(
-                        query="SELECT 'error' as response",
-                        explanation="I apologize, but I'm having trouble processing your question. Could you please rephrase it or try asking about data analysis instead."
-                    )
+                    return GENERAL_KNOWLEDGE_ERROR
 
             # Check if table_name is provided for data analysis questions
             if not table_name:
-                return SQLQuery(
-                    query="SELECT * FROM current_dataset LIMIT 5",
-                    explanation="Here are the top 5 rows from your dataset.",
-                    summary="Showing top 5 rows"
-                )
+                return DEFAULT_PREVIEW_QUERY
 
-            # Create prompt with table schema if available
-            system_prompt = self._get_system_prompt(table_name, table_schema)
-            prompt_template = ChatPromptTemplate.from_messages([
-                ("system", system_prompt),
-                ("human", "{question}")
-            ])
-
-            # Handle regular data analysis queries
-            prompt = prompt_template.format_messages(
-                question=question,
-                format_instructions=self.parser.get_format_instructions()
-            )
-            
-            logger.info(f"Processing question: {question}")
-            if table_name:
-                logger.info(f"Using table: {table_name}")
-                logger.info(f"Table schema: {json.dumps(table_schema, indent=2)}")
+            # Repeated questions against the same schema skip the LLM entirely
+            cache_key = self._query_cache_key(question, table_name, table_schema)
+            cached_query = self._get_cached_query(cache_key)
+            if cached_query is not None:
+                logger.info(f"Using cached SQL for question: {question}")
+                return cached_query
 
+            prompt = self._sql_messages(question, table_name, table_schema)
             for attempt in range(1, self.max_retries + 1):
                 try:
-                    response = self.llm.invoke(prompt)
-                    sql_query = self.parser.parse(response.content)
-                    logger.info(f"Generated SQL Query: {sql_query.query}")
-                    
-                    # Format the explanation with proper spacing and structure
-                    formatted_explanation = sql_query.explanation.strip()
-                    if formatted_explanation:
-                        # Add line breaks between sections
-                        formatted_explanation = formatted_explanation.replace('. ', '.\n\n')
-                        # Add a newline before 'Please ask me' for better separation
-                        formatted_explanation = re.sub(r'(trends)( Please ask me)', r'\1.\n\2', formatted_explanation)
-                        # Ensure every bullet starts on a new line
-                        formatted_explanation = formatted_explanation.replace('•', '\n•')
-                        # Ensure every numbered list item starts on a new line
-                        formatted_explanation = re.sub(r'(?<!\n)(\d+\.)', r'\n\1', formatted_explanation)
-                        # Remove any double line breaks
-                        formatted_explanation = re.sub(r'\n{3,}', '\n\n', formatted_explanation)
-                    
-                    # Create a formal response for the frontend
-                    formal_response = "Here are the results of your analysis."
-                    if 'limit 5' in sql_query.query.lower():
-                        formal_response = "Here are the top 5 records from your analysis."
-                    elif 'limit 10' in sql_query.query.lower():
-                        formal_response = "Here are the top 10 records from your analysis."
-                    elif 'count' in sql_query.query.lower():
-                        formal_response = "Here is the count from your analysis."
-                    elif 'sum' in sql_query.query.lower():
-                        formal_response = "Here is the sum from your analysis."
-                    elif 'avg' in sql_query.query.lower():
-                        formal_response = "Here is the average from your analysis."
-                    
-                    return SQLQuery(
-                        query=sql_query.query,
-                        explanation=formatted_explanation,  # This will be used for the info section
-                        summary=formal_response  # This will be used for the main response
-                    )
-                    
+                    response = await self.llm.ainvoke(prompt)
+                    result = self._build_sql_result(response.content)
+                    self._cache_query(cache_key, result)
+                    return result
                 except (InternalServerError, RateLimitError, BadRequestError) as e:
                     if not self._handle_groq_error(e, attempt):
                         raise
                     if attempt == self.max_retries:
                         raise
-                    time.sleep(self.retry_delay * attempt)
+                    await asyncio.sleep(self._backoff_delay(attempt))
                 except Exception as e:
-                    logger.error(f"Unexpected error during query generation: {str(e)}")
-                    # For out-of-scope questions, return a helpful response
-                    if "cannot generate SQL" in str(e).lower():
-                        return SQLQuery(
-                            query="SELECT 'out_of_scope' as type",
-                            explanation="""I'm having trouble understanding how to analyze your data with that question.
+                    return self._out_of_scope_or_raise(e)
+        except Exception as e:
+            logger.error(f"Error in query generation: {str(e)}")
+            return GENERATION_ERROR
 
-I can help you with:
-• Basic data exploration (viewing data, unique values, basic stats)
-• Aggregations (sums, averages, counts)
-• Filtering and sorting
-• Time-based analysis (if date columns exist)
-• Statistical analysis (correlations, distributions)
+    async def warmup(self) -> None:
+        """Create the Groq client and make one tiny call, so the first user request skips connection setup.
 
-Try rephrasing your question to focus on analyzing the data, or type 'help' to see examples!"""
-                        )
-                    raise
+        The call is capped at a single output token, so a boot or reload costs almost no token or
+        rate-limit budget, and at WARMUP_TIMEOUT seconds. Failures (e.g. no API key in development)
+        and timeouts are logged and otherwise ignored.
+        """
+        try:
+            await asyncio.wait_for(self.llm.bind(max_tokens=1).ainvoke("hi"), timeout=WARMUP_TIMEOUT)
+            logger.info("Groq client warmed up")
         except Exception as e:
-            logger.error(f"Error in query generation: {str(e)}")
-            return SQLQuery(
-                query="SELECT 'error' as type",
-                explanation="I apologize, but I encountered an error while processing your request. Please try again or rephrase your question."
-            )
+            logger.warning(f"Groq warmup failed: {str(e)}")
+
+    def is_general_knowledge_question(self, question: str, table_name: Optional[str] = None) -> bool:
+        """True if agenerate_query would answer question with the general-knowledge LLM prompt."""
+        question_lower = question.lower().strip()
+        return (
+            self._answer_without_llm(question, question_lower, table_name) is None
+            and not self.is_data_analysis_question(question, normalized=question_lower)
+        )
+
+    async def astream_general_knowledge(self, question: str, history: Optional[list] = None) -> AsyncIterator[str]:
+        """Stream the general-knowledge answer to question as the LLM generates it."""
+        streamed = False
+        try:
+            async for chunk in self.llm.astream(self._general_knowledge_messages(question, history)):
+                if chunk.content:
+                    streamed = True
+                    yield chunk.content
+        except Exception as e:
+            logger.error(f"Error streaming general knowledge response: {str(e)}")
+            if not streamed:
+                yield GENERAL_KNOWLEDGE_ERROR.explanation
 
     def get_visualization_type(self, query: str, result_data: List[dict]) -> str:
         """Determine the best visualization type based on query and data."""
         if not result_data:
             return "table"
-            
-        # Check for aggregation queries
-        if "COUNT" in query.upper() or "GROUP BY" in query.upper():
-            if len(result_data) <= 5:
-                return "pie"
-            return "bar"
-            
-        # Check for time series data
-        if "DATE" in query.upper() or "MONTH" in query.upper() or "YEAR" in query.upper():
-            return "line"
-            
-        # Check for correlation/scatter plot potential
-        if len(result_data[0].keys()) >= 2 and all(isinstance(v, (int, float)) for v in result_data[0].values()):
-            return "scatter"
-            
-        # Default to table view
-        return "table"
+        # Only the row count up to the pie threshold and the first row's value types matter
+        value_types = tuple(type(value) for value in result_data[0].values())
+        return _visualization_type(query, min(len(result_data), 6), value_types)
 
     def generate_visualization(self, 
                              result_data: List[dict], 
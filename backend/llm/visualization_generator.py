@@ -1,8 +1,6 @@
-import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import pandas as pd
-import json
 from typing import List, Dict, Any, Optional
 import base64
 from io import BytesIO
@@ -32,9 +30,6 @@ class VisualizationGenerator:
                 'error': 'No data available for visualization'
             }
 
-        # Convert data to pandas DataFrame
-        df = pd.DataFrame(data)
-        
         # Get the appropriate visualization function
         viz_func = self.supported_visualizations.get(viz_type.lower())
         if not viz_func:
@@ -43,14 +38,36 @@ class VisualizationGenerator:
             }
 
         try:
+            # Tables pass the records through unchanged; only charts need a DataFrame
+            if viz_func == self._create_table:
+                return self._table_from_records(data, title)
+
             # Generate the visualization
-            viz_data = viz_func(df, title, x_label, y_label)
+            viz_data = viz_func(pd.DataFrame(data), title, x_label, y_label)
             return viz_data
         except Exception as e:
             return {
                 'error': f'Error generating visualization: {str(e)}'
             }
 
+    @staticmethod
+    def _xy_figure(trace: Dict[str, Any],
+                   df: pd.DataFrame,
+                   x_col: str,
+                   y_col: str,
+                   title: str,
+                   x_label: Optional[str] = None,
+                   y_label: Optional[str] = None) -> Dict[str, Any]:
+        """Build a Plotly.js figure dict for a single x/y trace without going through Plotly Express."""
+        return {
+            'data': [{**trace, 'x': df[x_col].tolist(), 'y': df[y_col].tolist()}],
+            'layout': {
+                'title': {'text': title},
+                'xaxis': {'title': {'text': x_label or x_col}},
+                'yaxis': {'title': {'text': y_label or y_col}}
+            }
+        }
+
     def _create_bar_chart(self, 
                          df: pd.DataFrame,
                          title: Optional[str] = None,
@@ -61,15 +78,12 @@ class VisualizationGenerator:
         x_col = df.columns[0]
         y_col = df.columns[1]
 
-        fig = px.bar(df, 
-                    x=x_col, 
-                    y=y_col,
-                    title=title or f'{y_col} by {x_col}',
-                    labels={x_col: x_label or x_col, y_col: y_label or y_col})
+        fig = self._xy_figure({'type': 'bar'}, df, x_col, y_col,
+                              title or f'{y_col} by {x_col}', x_label, y_label)
 
         return {
             'type': 'bar',
-            'data': json.loads(fig.to_json()),
+            'data': fig,
             'title': title or f'{y_col} by {x_col}'
         }
 
@@ -82,15 +96,12 @@ class VisualizationGenerator:
         x_col = df.columns[0]
         y_col = df.columns[1]
 
-        fig = px.line(df,
-                     x=x_col,
-                     y=y_col,
-                     title=title or f'{y_col} over {x_col}',
-                     labels={x_col: x_label or x_col, y_col: y_label or y_col})
+        fig = self._xy_figure({'type': 'scatter', 'mode': 'lines'}, df, x_col, y_col,
+                              title or f'{y_col} over {x_col}', x_label, y_label)
 
         return {
             'type': 'line',
-            'data': json.loads(fig.to_json()),
+            'data': fig,
             'title': title or f'{y_col} over {x_col}'
         }
 
@@ -103,14 +114,18 @@ class VisualizationGenerator:
         labels_col = df.columns[0]
         values_col = df.columns[1]
 
-        fig = px.pie(df,
-                    names=labels_col,
-                    values=values_col,
-                    title=title or f'Distribution of {values_col} by {labels_col}')
+        fig = {
+            'data': [{
+                'type': 'pie',
+                'labels': df[labels_col].tolist(),
+                'values': df[values_col].tolist()
+            }],
+            'layout': {'title': {'text': title or f'Distribution of {values_col} by {labels_col}'}}
+        }
 
         return {
             'type': 'pie',
-            'data': json.loads(fig.to_json()),
+            'data': fig,
             'title': title or f'Distribution of {values_col} by {labels_col}'
         }
 
@@ -123,15 +138,12 @@ class VisualizationGenerator:
         x_col = df.columns[0]
         y_col = df.columns[1]
 
-        fig = px.scatter(df,
-                        x=x_col,
-                        y=y_col,
-                        title=title or f'{y_col} vs {x_col}',
-                        labels={x_col: x_label or x_col, y_col: y_label or y_col})
+        fig = self._xy_figure({'type': 'scatter', 'mode': 'markers'}, df, x_col, y_col,
+                              title or f'{y_col} vs {x_col}', x_label, y_label)
 
         return {
             'type': 'scatter',
-            'data': json.loads(fig.to_json()),
+            'data': fig,
             'title': title or f'{y_col} vs {x_col}'
         }
 
@@ -148,6 +160,17 @@ class VisualizationGenerator:
             'title': title or 'Data Table'
         }
 
+    def _table_from_records(self,
+                            data: List[Dict[str, Any]],
+                            title: Optional[str] = None) -> Dict[str, Any]:
+        """Create a table visualization from records, without a DataFrame round-trip."""
+        return {
+            'type': 'table',
+            'data': data,
+            'columns': list(dict.fromkeys(key for row in data for key in row)),
+            'title': title or 'Data Table'
+        }
+
     def get_supported_visualizations(self) -> List[str]:
         """Return list of supported visualization types."""
         return list(self.supported_visualizations.keys()) 
\ No newline at end of file
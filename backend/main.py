@@ -1,11 +1,17 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union, Iterator, Tuple
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 import json
+import orjson
+import asyncio
 import os
 from pathlib import Path
 import sys
@@ -20,8 +26,9 @@ if backend_dir not in sys.path:
 
 from db.models import get_engine, init_db, Base
 from db.dynamic_models import DynamicTableManager
-from llm.query_generator import QueryGenerator
+from llm.query_generator import QueryGenerator, SQLQuery, MAX_CONCURRENT_LLM_CALLS
 from processors.data_processor import DataProcessor
+from handlers.file_handler import CSV_BLOCK_SIZE
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -32,7 +39,7 @@ print("Environment Variables:")
 print(f"GROQ_API_KEY exists: {'GROQ_API_KEY' in os.environ}")
 print(f"GROQ_API_KEY length: {len(os.getenv('GROQ_API_KEY', ''))}")
 
-app = FastAPI(title="AI Data Analytics Chatbot")
+app = FastAPI(title="AI Data Analytics Chatbot", default_response_class=ORJSONResponse)
 
 # CORS middleware
 app.add_middleware(
@@ -51,10 +58,21 @@ data_processor = DataProcessor()
 
 logger = logging.getLogger(__name__)
 
+# Media type of the row-streaming /api/chat/rows endpoint
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched from the cursor, and written to the response, per batch when streaming
+ROW_BATCH_SIZE = 1000
+
+# Messages answered with the canned greeting before any database or LLM work
+GREETING_MESSAGES = frozenset({'hi', 'hello', 'hey', 'greetings'})
+
 class ChatMessage(BaseModel):
     message: str
     history: Optional[List[Dict[str, str]]] = None
 
+# Built only by the server from already-typed values, so handlers use model_construct to skip
+# validation; FastAPI still checks the response against response_model on the way out
 class ChatResponse(BaseModel):
     query: str
     explanation: str
@@ -65,10 +83,24 @@ class ChatResponse(BaseModel):
 class DatasetInfo(BaseModel):
     columns: List[Dict[str, str]]
     row_count: int
-    created_at: datetime
+    # None when the dataset predates this process and its upload time is unknown
+    created_at: Optional[datetime] = None
+
+# (table_manager.data_version, info) snapshot of the current dataset; only served while the version matches
+current_dataset_snapshot: Optional[Tuple[str, DatasetInfo]] = None
+
+# Serializes dataset replacement with snapshot loading so a lookup never caches a half-replaced dataset
+dataset_lock = asyncio.Lock()
+
+# Dataset-summary insights task per table_manager.data_version; only the latest version is kept
+insights_tasks: Dict[str, asyncio.Future] = {}
+
+# Background Groq warm-up started at startup; referenced so it is not garbage-collected mid-call
+warmup_task: Optional[asyncio.Task] = None
 
 @app.on_event("startup")
 async def startup_event():
+    global warmup_task
     try:
         # Initialize database
         Base.metadata.create_all(engine)
@@ -84,6 +116,8 @@ async def startup_event():
     except Exception as e:
         logger.error(f"Error initializing database on startup: {str(e)}")
         raise
+    # Open the Groq connection in the background, so startup never waits on the network
+    warmup_task = asyncio.create_task(query_generator.warmup())
 
 @app.get("/")
 @app.get("/api")
@@ -94,6 +128,112 @@ async def root():
         "version": "1.0.0"
     }
 
+def is_utf8_decode_error(error: pa.ArrowInvalid) -> bool:
+    """True if a pyarrow CSV error comes from invalid UTF-8 input rather than the CSV structure."""
+    message = str(error)
+    return 'UTF8' in message or 'UTF-8' in message
+
+def clean_column_names(names) -> List[str]:
+    """Strip and lowercase column names, replacing spaces and hyphens with underscores."""
+    return pd.Index(names).astype(str).str.strip().str.lower().str.replace(r'[ \-]', '_', regex=True).tolist()
+
+def read_csv_with_arrow(file: UploadFile) -> Optional[pa.Table]:
+    """Multi-threaded PyArrow parse, retried as Latin-1 for input that is not valid UTF-8.
+
+    Returns None when pyarrow rejects the CSV structure (e.g. a row with fewer fields than the header).
+    """
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=CSV_BLOCK_SIZE)
+    try:
+        table = pa_csv.read_csv(file.file, read_options=read_options)
+    except pa.ArrowInvalid as e:
+        # Structural errors (ragged rows, bad quoting) would fail the same way in any encoding
+        if not is_utf8_decode_error(e):
+            return None
+        table = None
+    # Not valid UTF-8 (type inference turns such columns into binary); retry as Latin-1,
+    # which decodes any byte sequence
+    if table is None or any(pa.types.is_binary(field.type) for field in table.schema):
+        file.file.seek(0)
+        read_options.encoding = 'latin1'
+        try:
+            table = pa_csv.read_csv(file.file, read_options=read_options)
+        except pa.ArrowInvalid:
+            return None
+    return table
+
+def read_csv_with_pandas(file: UploadFile) -> pd.DataFrame:
+    """Parse a CSV that pyarrow rejected with pandas, which pads short rows with NaN."""
+    try:
+        file.file.seek(0)
+        try:
+            return pd.read_csv(file.file)
+        except UnicodeDecodeError:
+            file.file.seek(0)
+            return pd.read_csv(file.file, encoding='latin1')
+    except ValueError as e:
+        # ParserError and EmptyDataError are ValueErrors
+        raise HTTPException(status_code=400, detail=f"Could not parse CSV file: {str(e)}")
+
+def read_uploaded_dataset(file: UploadFile) -> pd.DataFrame:
+    """Parse an uploaded CSV or Excel file into a DataFrame with cleaned column names."""
+    if file.filename.endswith('.csv'):
+        table = read_csv_with_arrow(file)
+        if table is None:
+            # Keep accepting the files pandas always loaded, such as ragged rows
+            df = read_csv_with_pandas(file)
+        else:
+            # Rename on the Arrow table, before any pandas conversion; columns stay Arrow-backed
+            table = table.rename_columns(clean_column_names(table.column_names))
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+    elif file.filename.endswith(('.xls', '.xlsx', '.xlsb')):
+        df = pd.read_excel(file.file, engine="calamine")
+    else:
+        raise HTTPException(status_code=400, detail="Unsupported file format. Please upload CSV or Excel files.")
+    df.columns = clean_column_names(df.columns)
+    return df
+
+def replace_current_dataset(df: pd.DataFrame) -> None:
+    """Reset the database and store df as the current dataset."""
+    table_manager.reset_database()
+    table_manager.insert_dataframe(df, "current_dataset")  # Use a fixed table name
+
+def load_current_dataset_info() -> DatasetInfo:
+    """Describe a current dataset that predates this process (e.g. after a restart); its upload time is unknown."""
+    schema = table_manager.get_table_schema("current_dataset")
+    return DatasetInfo(
+        columns=schema['columns'],
+        row_count=table_manager.count_rows("current_dataset")
+    )
+
+def execute_sql(query: str) -> List[Dict[str, Any]]:
+    """Run a generated query and return its rows as plain dicts."""
+    with Session(engine) as session:
+        result = session.execute(text(query))
+        # Plain dicts go straight into the response; no DataFrame round-trip
+        return [dict(row) for row in result.mappings()]
+
+def summarize_current_dataset() -> str:
+    """Load the entire current dataset and generate insights for it."""
+    df = pd.DataFrame(execute_sql('SELECT * FROM "current_dataset"'))
+    return data_processor.generate_insights(df)
+
+async def current_dataset_insights() -> str:
+    """Insights for the current dataset, shared by concurrent callers and reused until the data changes."""
+    version = table_manager.data_version
+    task = insights_tasks.get(version)
+    if task is None:
+        insights_tasks.clear()
+        task = asyncio.ensure_future(run_in_threadpool(summarize_current_dataset))
+        insights_tasks[version] = task
+    try:
+        # shield: a disconnecting client must not cancel the call other requests are waiting on
+        return await asyncio.shield(task)
+    except Exception:
+        # Let the next request retry instead of replaying the failure
+        if task.done() and insights_tasks.get(version) is task:
+            del insights_tasks[version]
+        raise
+
 @app.post("/upload", response_model=DatasetInfo)
 async def upload_dataset_direct(
     file: UploadFile = File(...)
@@ -104,39 +244,31 @@ async def upload_dataset_direct(
 async def upload_dataset(
     file: UploadFile = File(...)
 ):
+    global current_dataset_snapshot
     try:
-        # Read file based on extension
-        if file.filename.endswith('.csv'):
-            try:
-                df = pd.read_csv(file.file)
-            except UnicodeDecodeError:
-                file.file.seek(0)
-                df = pd.read_csv(file.file, encoding='latin1')
-        elif file.filename.endswith(('.xls', '.xlsx')):
-            df = pd.read_excel(file.file)
-        else:
-            raise HTTPException(status_code=400, detail="Unsupported file format. Please upload CSV or Excel files.")
-
-        # Clean column names
-        df.columns = [str(col).strip().lower().replace(' ', '_').replace('-', '_') for col in df.columns]
-        
-        # Reset database and insert new data
-        try:
-            table_manager.reset_database()
-            table_manager.insert_dataframe(df, "current_dataset")  # Use a fixed table name
-        except Exception as db_error:
-            error_detail = f"Database error: {str(db_error)}\nTraceback:\n{traceback.format_exc()}"
-            logger.error(error_detail)
-            raise HTTPException(status_code=500, detail="Failed to initialize database with new dataset")
+        # Read file based on extension and clean its column names, off the event loop
+        df = await run_in_threadpool(read_uploaded_dataset, file)
         
-        # Get table schema
-        schema = table_manager.get_table_schema("current_dataset")
-        
-        return DatasetInfo(
-            columns=schema['columns'],
-            row_count=len(df),
-            created_at=datetime.utcnow()
-        )
+        async with dataset_lock:
+            # Reset database and insert new data
+            current_dataset_snapshot = None
+            try:
+                await run_in_threadpool(replace_current_dataset, df)
+            except Exception as db_error:
+                error_detail = f"Database error: {str(db_error)}\nTraceback:\n{traceback.format_exc()}"
+                logger.error(error_detail)
+                raise HTTPException(status_code=500, detail="Failed to initialize database with new dataset")
+            
+            # Get table schema; the upload just invalidated the cache, so this queries SQLite
+            schema = await run_in_threadpool(table_manager.get_table_schema, "current_dataset")
+            
+            dataset_info = DatasetInfo(
+                columns=schema['columns'],
+                row_count=len(df),
+                created_at=datetime.utcnow()
+            )
+            current_dataset_snapshot = (table_manager.data_version, dataset_info)
+        return dataset_info
     
     except HTTPException:
         raise
@@ -148,21 +280,28 @@ async def upload_dataset(
         file.file.close()
 
 @app.get("/api/dataset", response_model=DatasetInfo)
-async def get_current_dataset():
+async def get_current_dataset(request: Request, response: Response):
+    global current_dataset_snapshot
     try:
-        tables = table_manager.list_tables()
-        if not tables or "current_dataset" not in tables:
-            raise HTTPException(status_code=404, detail="No dataset available. Please upload a dataset first.")
-            
-        schema = table_manager.get_table_schema("current_dataset")
-        sample_data = table_manager.get_table_data("current_dataset", limit=1)
-        row_count = len(sample_data) if sample_data else 0
+        # Conditional GET: nothing has changed since the client's copy
+        current_etag = f'"{table_manager.data_version}"'
+        if request.headers.get("if-none-match") == current_etag:
+            return Response(status_code=304, headers={"ETag": current_etag})
+
+        async with dataset_lock:
+            snapshot = current_dataset_snapshot
+            if snapshot is None or snapshot[0] != table_manager.data_version:
+                tables = table_manager.list_tables()
+                if not tables or "current_dataset" not in tables:
+                    raise HTTPException(status_code=404, detail="No dataset available. Please upload a dataset first.")
+                # Uploads hold the lock, so the version cannot move while the snapshot loads
+                version = table_manager.data_version
+                snapshot = current_dataset_snapshot = (version, await run_in_threadpool(load_current_dataset_info))
         
-        return DatasetInfo(
-            columns=schema['columns'],
-            row_count=row_count,
-            created_at=datetime.utcnow()
-        )
+        # The ETag names the version the returned snapshot was taken at, not whatever is current by now
+        version, dataset_info = snapshot
+        response.headers["ETag"] = f'"{version}"'
+        return dataset_info
     except HTTPException:
         raise
     except Exception as e:
@@ -170,119 +309,120 @@ async def get_current_dataset():
         logger.error(error_detail)
         raise HTTPException(status_code=500, detail=error_detail)
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(message: ChatMessage):
-    try:
-        # Check for greetings and special cases first
-        if message.message.lower() in ['hi', 'hello', 'hey', 'greetings']:
-            return ChatResponse(
-                query="SELECT 'greeting' as type",
-                explanation="Hello! I'm Quant - Query - Intelligent Analytics Assistant. I can help you analyze your data.",
-                summary="Greeting message",
-                data=[],
-                type="greeting"
-            )
+async def prepare_chat(message: ChatMessage) -> Union[ChatResponse, SQLQuery]:
+    """Answer a chat message that needs no query execution, or return the generated SQL to run."""
+    # Check for greetings and special cases first
+    if message.message.strip().lower() in GREETING_MESSAGES:
+        return ChatResponse.model_construct(
+            query="SELECT 'greeting' as type",
+            explanation="Hello! I'm Quant - Query - Intelligent Analytics Assistant. I can help you analyze your data.",
+            summary="Greeting message",
+            data=[],
+            type="greeting"
+        )
 
-        # Check if dataset exists for data analysis questions
-        if not table_manager.list_tables() or "current_dataset" not in table_manager.list_tables():
-            return ChatResponse(
-                query="SELECT 'no_dataset' as type",
-                explanation="I don't see any dataset available. Please upload a dataset first, and then I'll be happy to help you analyze it!",
-                summary="No dataset available",
-                data=[],
-                type="no_dataset"
-            )
-            
-        # Get table schema
-        table_schema = table_manager.get_table_schema("current_dataset")
-        logger.info(f"Table schema passed to LLM: {json.dumps(table_schema, indent=2)}")
-        
-        # Generate SQL query from natural language, passing history
-        sql_query = query_generator.generate_query(
-            message.message,
-            table_name="current_dataset",
-            table_schema=table_schema,
-            history=message.history
+    # Check if dataset exists for data analysis questions
+    if "current_dataset" not in table_manager.list_tables():
+        return ChatResponse.model_construct(
+            query="SELECT 'no_dataset' as type",
+            explanation="I don't see any dataset available. Please upload a dataset first, and then I'll be happy to help you analyze it!",
+            summary="No dataset available",
+            data=[],
+            type="no_dataset"
         )
-        logger.info(f"LLM raw response: {sql_query}")
-        logger.info(f"Generated SQL Query: {sql_query.query}")
         
-        # Handle special response types without executing SQL
-        special_types = [
-            ("SELECT 'greeting'", "greeting"),
-            ("SELECT 'help'", "help"),
-            ("SELECT 'out_of_scope'", "out_of_scope"),
-            ("SELECT 'knowledge_base'", "knowledge_base"),
-            ("SELECT 'general_knowledge'", "general_knowledge"),
-            ("SELECT 'operation'", "operation"),
-            ("SELECT 'dataset_summary'", "dataset_summary")
-        ]
-        for prefix, resp_type in special_types:
-            if sql_query.query.startswith(prefix):
-                if resp_type == "dataset_summary":
-                    # Load the entire dataset
-                    with Session(engine) as session:
-                        result = session.execute(text('SELECT * FROM "current_dataset"'))
-                        data = list(result.mappings())
-                    df = pd.DataFrame(data)
-                    
-                    # Generate insights
-                    insights = data_processor.generate_insights(df)
-                    
-                    return ChatResponse(
-                        query=sql_query.query,
-                        explanation=insights,
-                        summary="Here is a summary of the dataset:",
-                        data=[],
-                        type="dataset_summary"
-                    )
+    # Get table schema
+    table_schema = table_manager.get_table_schema("current_dataset")
+    logger.info(f"Table schema passed to LLM: {json.dumps(table_schema, indent=2)}")
+    
+    # Generate SQL query from natural language, passing history; awaiting the async
+    # Groq call lets concurrent chat requests overlap their LLM round-trips
+    sql_query = await query_generator.agenerate_query(
+        message.message,
+        table_name="current_dataset",
+        table_schema=table_schema,
+        history=message.history
+    )
+    logger.info(f"LLM raw response: {sql_query}")
+    logger.info(f"Generated SQL Query: {sql_query.query}")
+    
+    # Handle special response types without executing SQL
+    special_types = [
+        ("SELECT 'greeting'", "greeting"),
+        ("SELECT 'help'", "help"),
+        ("SELECT 'out_of_scope'", "out_of_scope"),
+        ("SELECT 'knowledge_base'", "knowledge_base"),
+        ("SELECT 'general_knowledge'", "general_knowledge"),
+        ("SELECT 'operation'", "operation"),
+        ("SELECT 'dataset_summary'", "dataset_summary")
+    ]
+    for prefix, resp_type in special_types:
+        if sql_query.query.startswith(prefix):
+            if resp_type == "dataset_summary":
+                # Load the entire dataset and generate insights once per data version, off the event loop
+                insights = await current_dataset_insights()
                 
-                return ChatResponse(
+                return ChatResponse.model_construct(
                     query=sql_query.query,
-                    explanation=sql_query.explanation,
-                    summary=sql_query.summary,
+                    explanation=insights,
+                    summary="Here is a summary of the dataset:",
                     data=[],
-                    type=resp_type
+                    type="dataset_summary"
                 )
-        # Additional check: If query is empty or not a SELECT, treat as special response
-        if not sql_query.query or not sql_query.query.strip().lower().startswith('select'):
-            return ChatResponse(
+            
+            return ChatResponse.model_construct(
                 query=sql_query.query,
-                explanation=sql_query.explanation or "I'm sorry, I couldn't generate a valid SQL query for your request.",
-                summary=sql_query.summary or "",
+                explanation=sql_query.explanation,
+                summary=sql_query.summary,
                 data=[],
-                type="invalid_query"
+                type=resp_type
             )
+    # Additional check: If query is empty or not a SELECT, treat as special response
+    if not sql_query.query or not sql_query.query.strip().lower().startswith('select'):
+        return ChatResponse.model_construct(
+            query=sql_query.query,
+            explanation=sql_query.explanation or "I'm sorry, I couldn't generate a valid SQL query for your request.",
+            summary=sql_query.summary or "",
+            data=[],
+            type="invalid_query"
+        )
+
+    return sql_query
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(message: ChatMessage):
+    try:
+        prepared = await prepare_chat(message)
+        if isinstance(prepared, ChatResponse):
+            return prepared
+        sql_query = prepared
+
+        # Execute query for regular data analysis questions in the threadpool, so
+        # concurrent chats are not serialized on the event loop
+        try:
+            data = await run_in_threadpool(execute_sql, sql_query.query)
+        except Exception as e:
+            if "no such column: summary" in str(e):
+                # Fallback to dataset summary
+                df = pd.DataFrame(await run_in_threadpool(table_manager.get_table_data, "current_dataset"))
+                insights = await run_in_threadpool(data_processor.generate_insights, df)
+                return ChatResponse.model_construct(
+                    query=sql_query.query,
+                    explanation=insights,
+                    summary="Here is a summary of the dataset:",
+                    data=[],
+                    type="dataset_summary"
+                )
+            else:
+                raise
         
-        # Execute query for regular data analysis questions
-        with Session(engine) as session:
-            try:
-                result = session.execute(text(sql_query.query))
-                data = list(result.mappings())
-            except Exception as e:
-                if "no such column: summary" in str(e):
-                    # Fallback to dataset summary
-                    df = pd.DataFrame(table_manager.get_table_data("current_dataset"))
-                    insights = data_processor.generate_insights(df)
-                    return ChatResponse(
-                        query=sql_query.query,
-                        explanation=insights,
-                        summary="Here is a summary of the dataset:",
-                        data=[],
-                        type="dataset_summary"
-                    )
-                else:
-                    raise
-        
-        # Convert to pandas for easier data manipulation
-        df = pd.DataFrame(data)
-        logger.info(f"DataFrame columns: {df.columns.tolist()}")
+        logger.info(f"Result columns: {list(data[0]) if data else []}")
         
-        return ChatResponse(
+        return ChatResponse.model_construct(
             query=sql_query.query,
             explanation=sql_query.explanation,
             summary=sql_query.summary,
-            data=json.loads(df.to_json(orient="records")),
+            data=data,
             type="data_analysis"
         )
     except Exception as e:
@@ -290,14 +430,110 @@ async def chat(message: ChatMessage):
         logger.error(error_detail)
         raise HTTPException(status_code=500, detail=error_detail)
 
+def stream_chat_rows(sql_query: SQLQuery) -> Iterator[bytes]:
+    """Yield an NDJSON header line with the response fields, then one line per result row.
+
+    Errors after the response has started are reported as a final {"type": "error"} line.
+    """
+    try:
+        with Session(engine) as session:
+            try:
+                # yield_per fetches ROW_BATCH_SIZE rows at a time (server-side cursor where the driver has one)
+                result = session.execute(text(sql_query.query).execution_options(yield_per=ROW_BATCH_SIZE))
+            except Exception as e:
+                if "no such column: summary" not in str(e):
+                    raise
+                # Fallback to dataset summary
+                df = pd.DataFrame(table_manager.get_table_data("current_dataset"))
+                yield orjson.dumps({
+                    "query": sql_query.query,
+                    "explanation": data_processor.generate_insights(df),
+                    "summary": "Here is a summary of the dataset:",
+                    "type": "dataset_summary"
+                }) + b"\n"
+                return
+
+            yield orjson.dumps({
+                "query": sql_query.query,
+                "explanation": sql_query.explanation,
+                "summary": sql_query.summary,
+                "type": "data_analysis"
+            }) + b"\n"
+            for rows in result.mappings().partitions():
+                yield b"".join(orjson.dumps(dict(row)) + b"\n" for row in rows)
+    except Exception as e:
+        logger.error(f"Error streaming chat rows: {str(e)}\nTraceback:\n{traceback.format_exc()}")
+        yield orjson.dumps({"type": "error", "detail": str(e)}) + b"\n"
+
+@app.post("/api/chat/rows")
+async def chat_rows(message: ChatMessage):
+    """Like /api/chat, but as NDJSON: a header line with query/explanation/summary/type, then one line per row.
+
+    Responses that run no query are a single header line whose "data" field is empty.
+    """
+    try:
+        prepared = await prepare_chat(message)
+    except Exception as e:
+        error_detail = f"Error: {str(e)}\nTraceback:\n{traceback.format_exc()}"
+        logger.error(error_detail)
+        raise HTTPException(status_code=500, detail=error_detail)
+    if isinstance(prepared, ChatResponse):
+        return StreamingResponse(iter([orjson.dumps(prepared.model_dump()) + b"\n"]), media_type=NDJSON_MEDIA_TYPE)
+    # A sync generator is iterated in the threadpool, so SQLite reads stay off the event loop
+    return StreamingResponse(stream_chat_rows(prepared), media_type=NDJSON_MEDIA_TYPE)
+
+@app.post("/api/chat_batch", response_model=List[ChatResponse])
+async def chat_batch(messages: List[ChatMessage]):
+    """Answer several chat messages concurrently, returning responses in request order.
+
+    A message that fails gets a response of type "error" carrying the error detail; the
+    other messages in the batch are still answered.
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_LLM_CALLS)
+
+    async def answer(message: ChatMessage) -> ChatResponse:
+        async with semaphore:
+            try:
+                return await chat(message)
+            except HTTPException as e:
+                # chat() reports every failure as an HTTPException
+                return ChatResponse.model_construct(
+                    query="",
+                    explanation=str(e.detail),
+                    summary="",
+                    data=[],
+                    type="error"
+                )
+
+    return await asyncio.gather(*(answer(message) for message in messages))
+
+@app.post("/api/chat/stream")
+async def chat_stream(message: ChatMessage):
+    """Like /api/chat, but general-knowledge answers are streamed as text/plain while the LLM generates them.
+
+    Every other message type is answered with the same JSON body as /api/chat.
+    """
+    if (
+        "current_dataset" in table_manager.list_tables()
+        and query_generator.is_general_knowledge_question(message.message, table_name="current_dataset")
+    ):
+        return StreamingResponse(
+            query_generator.astream_general_knowledge(message.message, history=message.history),
+            media_type="text/plain; charset=utf-8"
+        )
+    return await chat(message)
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy"}
 
 @app.post("/api/reset")
 async def reset_database():
+    global current_dataset_snapshot
     try:
-        table_manager.reset_database()
+        async with dataset_lock:
+            current_dataset_snapshot = None
+            await run_in_threadpool(table_manager.reset_database)
         return {"status": "success", "message": "Database reset successfully"}
     except Exception as e:
         error_detail = f"Error resetting database: {str(e)}"
@@ -1,9 +1,10 @@
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import matplotlib.pyplot as plt
 import seaborn as sns
-from typing import Dict, Any, List, Union, Optional
+from typing import Dict, Any, List, Union, Optional, Tuple
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 import os
@@ -19,15 +20,39 @@ class DataProcessor:
             api_key=os.getenv("GROQ_API_KEY"),
             model_name="llama-3.1-8b-instant"
         )
+        # Insights prompt and chain are built once and invoked per request
+        self._insights_chain = ChatPromptTemplate.from_messages([
+            ("system", "You are a data analyst. Analyze the following data summary and provide key insights."),
+            ("user", """
+            Data Summary:
+            {summary}
+            
+            User Query (if any):
+            {query}
+            
+            Please provide key insights and observations about this data.
+            """)
+        ]) | self.llm
     
-    def get_summary(self, df: pd.DataFrame) -> Dict[str, Any]:
-        """Generate a summary of the DataFrame"""
-        summary = {
+    def _compute_stats(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """Compute the reductions shared by get_summary and generate_insights in one pass"""
+        return {
             "shape": df.shape,
             "columns": df.columns.tolist(),
-            "dtypes": df.dtypes.to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "numeric_summary": df.describe().to_dict() if not df.empty else {},
+            # count() reduces each column directly instead of materializing an isnull() mask frame
+            "missing_values": (len(df) - df.count()).to_dict(),
+            "numeric_summary": df.describe().to_dict() if not df.empty else {}
+        }
+    
+    def get_summary(self, df: pd.DataFrame, stats: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Generate a summary of the DataFrame, reusing precomputed stats if given"""
+        stats = stats or self._compute_stats(df)
+        summary = {
+            "shape": stats["shape"],
+            "columns": stats["columns"],
+            "dtypes": df.dtypes.astype(str).to_dict(),
+            "missing_values": stats["missing_values"],
+            "numeric_summary": stats["numeric_summary"],
             "categorical_summary": {
                 col: df[col].value_counts().to_dict()
                 for col in df.select_dtypes(include=['object', 'category']).columns
@@ -35,39 +60,41 @@ class DataProcessor:
         }
         return summary
     
-    def generate_insights(self, df: pd.DataFrame, query: Optional[str] = None) -> str:
-        """Generate insights using LLM"""
+    def summarize_and_insights(self, df: pd.DataFrame, query: Optional[str] = None) -> Tuple[Dict[str, Any], str]:
+        """Generate the summary and LLM insights from a single statistics pass"""
+        stats = self._compute_stats(df)
+        return self.get_summary(df, stats), self.generate_insights(df, query, stats)
+    
+    def generate_insights(self, df: pd.DataFrame, query: Optional[str] = None, stats: Optional[Dict[str, Any]] = None) -> str:
+        """Generate insights using LLM, reusing precomputed stats if given"""
+        stats = stats or self._compute_stats(df)
         # Only send a compact summary to the LLM
         compact_summary = {
-            "shape": df.shape,
-            "columns": df.columns.tolist(),
+            "shape": stats["shape"],
+            "columns": stats["columns"],
             "dtypes": df.dtypes.astype(str).to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
-            "numeric_summary": df.describe().to_dict() if not df.empty else {},
+            "missing_values": stats["missing_values"],
+            "numeric_summary": stats["numeric_summary"],
             "sample_rows": df.head(5).to_dict(orient="records") if not df.empty else []
         }
         
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a data analyst. Analyze the following data summary and provide key insights."),
-            ("user", """
-            Data Summary:
-            {summary}
-            
-            User Query (if any):
-            {query}
-            
-            Please provide key insights and observations about this data.
-            """)
-        ])
-        
-        chain = prompt | self.llm
-        response = chain.invoke({
+        response = self._insights_chain.invoke({
             "summary": str(compact_summary),
             "query": query or "No specific query provided"
         })
         
         return response.content
     
+    @staticmethod
+    def _correlation_matrix(df: pd.DataFrame) -> pd.DataFrame:
+        """Pearson correlation of the numeric columns, computed by np.corrcoef when there are no missing values"""
+        numeric = df.select_dtypes(include='number')
+        values = numeric.to_numpy(dtype=np.float64, na_value=np.nan)
+        if min(values.shape) < 2 or np.isnan(values).any():
+            # Degenerate shapes and pairwise-complete correlation need pandas' handling
+            return numeric.corr()
+        return pd.DataFrame(np.corrcoef(values, rowvar=False), index=numeric.columns, columns=numeric.columns)
+    
     def create_visualization(
         self,
         df: pd.DataFrame,
@@ -90,7 +117,7 @@ class DataProcessor:
             fig = px.box(df, x=x, y=y, **kwargs)
         elif viz_type == "heatmap":
             plt.figure(figsize=(10, 8))
-            fig = sns.heatmap(df.corr(), annot=True, cmap='coolwarm')
+            fig = sns.heatmap(self._correlation_matrix(df), annot=True, cmap='coolwarm')
         else:
             raise ValueError(f"Unsupported visualization type: {viz_type}")
         
@@ -114,8 +141,12 @@ class DataProcessor:
         df: pd.DataFrame,
         operations: List[Dict[str, Any]]
     ) -> pd.DataFrame:
-        """Apply a series of data processing operations"""
-        result_df = df.copy()
+        """Apply a series of data processing operations.
+
+        Every operation returns a new frame (user params cannot request inplace), so df itself is
+        never modified and is not copied up front.
+        """
+        result_df = df
         
         for op in operations:
             op_type = op.get("type")
@@ -131,7 +162,8 @@ class DataProcessor:
                     ascending=params.get("ascending", True)
                 )
             elif op_type == "drop_duplicates":
-                result_df = result_df.drop_duplicates(**params)
+                # inplace would mutate the caller's frame, which is not copied
+                result_df = result_df.drop_duplicates(**{k: v for k, v in params.items() if k != "inplace"})
             elif op_type == "fillna":
                 result_df = result_df.fillna(params.get("value"))
             else:
@@ -1,15 +1,19 @@
 from typing import Dict, Any, List, Optional, Tuple
 import pandas as pd
-from langchain.chat_models.groq import ChatGroq
+from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate
 import os
 from dotenv import load_dotenv
 import re
 import logging
+import functools
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Maximum number of distinct column layouts whose role mapping is memoized
+COLUMN_ROLES_CACHE_SIZE = 128
+
 class NaturalLanguageProcessor:
     """Process natural language queries about any dataset"""
     
@@ -20,7 +24,7 @@ class NaturalLanguageProcessor:
         )
         
         # Common patterns for identifying query types
-        self.query_patterns = {
+        query_patterns = {
             'category_analysis': [
                 r'which.*(?:category|city|state|region|location).*(?:highest|most|top|best)',
                 r'what.*(?:category|city|state|region|location).*(?:highest|most|top|best)',
@@ -56,7 +60,7 @@ class NaturalLanguageProcessor:
         }
         
         # Common column patterns to identify relevant columns
-        self.column_patterns = {
+        column_patterns = {
             'category': [
                 r'category',
                 r'type',
@@ -107,34 +111,48 @@ class NaturalLanguageProcessor:
                 r'day'
             ]
         }
+        
+        # Fuse each category's patterns into one case-insensitive alternation, compiled once
+        self.query_patterns = {
+            category: self._compile_alternation(patterns)
+            for category, patterns in query_patterns.items()
+        }
+        self.column_patterns = {
+            category: self._compile_alternation(patterns)
+            for category, patterns in column_patterns.items()
+        }
+        
+        # Memoize the pattern scan per column layout; the same dataset is analysed repeatedly
+        self._column_roles_cache = functools.lru_cache(maxsize=COLUMN_ROLES_CACHE_SIZE)(self._match_column_roles)
+    
+    @staticmethod
+    def _compile_alternation(patterns: List[str]) -> re.Pattern:
+        """Compile patterns into a single regex matching wherever any of them would"""
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), re.IGNORECASE)
+    
+    def _match_column_roles(self, columns: Tuple[str, ...]) -> Dict[str, str]:
+        """Map each column role to the first column whose name matches that role's patterns"""
+        roles = {}
+        for col in columns:
+            for category, pattern in self.column_patterns.items():
+                if category not in roles and pattern.search(col):
+                    roles[category] = col
+        return roles
     
     def identify_query_type(self, question: str) -> str:
         """Identify the type of analysis needed based on the question"""
-        question_lower = question.lower()
-        
-        for query_type, patterns in self.query_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, question_lower):
-                    return query_type
+        for query_type, pattern in self.query_patterns.items():
+            if pattern.search(question):
+                return query_type
         
         return 'general_analysis'
     
     def identify_relevant_columns(self, df: pd.DataFrame, query_type: str) -> Dict[str, str]:
         """Identify relevant columns based on query type and column patterns"""
         columns = df.columns.tolist()
-        relevant_columns = {}
         
-        # Map columns to their roles based on patterns
-        for col in columns:
-            col_lower = col.lower()
-            
-            # Check each column pattern category
-            for category, patterns in self.column_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, col_lower):
-                        if category not in relevant_columns:
-                            relevant_columns[category] = col
-                            break
+        # Map columns to their roles based on patterns (copied, since it is extended below)
+        relevant_columns = dict(self._column_roles_cache(tuple(columns)))
         
         # For specific query types, ensure we have the right columns
         if query_type == 'category_analysis':
@@ -181,8 +199,9 @@ class NaturalLanguageProcessor:
                     category_col = relevant_columns['category']
                     sales_col = relevant_columns['sales']
                     
-                    # Calculate category performance
-                    category_analysis = df.groupby(category_col)[sales_col].agg([
+                    # Calculate category performance; results are ranked by sort_values, so the
+                    # groupby skips its own key sort and unobserved categorical levels
+                    category_analysis = df.groupby(category_col, sort=False, observed=True)[sales_col].agg([
                         ('total_sales', 'sum'),
                         ('average_sales', 'mean'),
                         ('transaction_count', 'count')
@@ -204,7 +223,7 @@ class NaturalLanguageProcessor:
                     if sales_col:
                         agg_dict['total_sales'] = 'sum'
                     
-                    product_analysis = df.groupby(product_col).agg(agg_dict)
+                    product_analysis = df.groupby(product_col, sort=False, observed=True).agg(agg_dict)
                     if sales_col:
                         product_analysis = product_analysis.sort_values('total_sales', ascending=False)
                     elif quantity_col:
@@ -226,7 +245,7 @@ class NaturalLanguageProcessor:
                         agg_dict['total_sales'] = 'sum'
                         agg_dict['average_sales'] = 'mean'
                     
-                    customer_analysis = df.groupby(customer_col).agg(agg_dict)
+                    customer_analysis = df.groupby(customer_col, sort=False, observed=True).agg(agg_dict)
                     if sales_col:
                         customer_analysis = customer_analysis.sort_values('total_sales', ascending=False)
                     else:
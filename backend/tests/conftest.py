@@ -0,0 +1,16 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the backend directory to the Python path, as main.py does
+backend_dir = str(Path(__file__).resolve().parent.parent)
+if backend_dir not in sys.path:
+    sys.path.insert(0, backend_dir)
+
+# Groq clients are constructed at import time and need a key; the tests never call the API
+os.environ.setdefault("GROQ_API_KEY", "test")
+
+# main.py and app.py create their database and upload/visualization directories relative to the
+# working directory at import time; keep them out of the source tree
+os.chdir(tempfile.mkdtemp())
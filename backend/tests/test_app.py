@@ -0,0 +1,102 @@
+import sqlite3
+
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pytest
+from fastapi.testclient import TestClient
+
+import app as app_module
+
+
+@pytest.fixture
+def client():
+    return TestClient(app_module.app)
+
+
+@pytest.fixture
+def sales_db(tmp_path):
+    db_path = tmp_path / "sales.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE sales (id INTEGER, state TEXT)")
+    conn.executemany("INSERT INTO sales VALUES (?, ?)", [(i, "CA" if i % 2 else None) for i in range(5)])
+    conn.commit()
+    conn.close()
+    return str(db_path)
+
+
+def test_query_rows_streams_ndjson(client, sales_db):
+    response = client.post("/query/rows", params={
+        "db_type": "sqlite", "connection_string": sales_db, "query": "SELECT * FROM sales ORDER BY id"
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(app_module.NDJSON_MEDIA_TYPE)
+    rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert rows == [{"id": i, "state": "CA" if i % 2 else None} for i in range(5)]
+
+
+def test_query_rows_reports_sql_errors_as_400(client, sales_db):
+    response = client.post("/query/rows", params={
+        "db_type": "sqlite", "connection_string": sales_db, "query": "SELECT * FROM missing"
+    })
+
+    assert response.status_code == 400
+
+
+def test_ndjson_rows_spans_chunks_and_reports_late_errors():
+    def chunks():
+        yield pd.DataFrame({"x": [1, 2]})
+        yield pd.DataFrame({"x": [3]})
+        raise RuntimeError("connection lost")
+
+    lines = [orjson.loads(line) for line in b"".join(app_module.ndjson_rows(chunks())).splitlines()]
+
+    assert lines == [{"x": 1}, {"x": 2}, {"x": 3}, {"type": "error", "detail": "connection lost"}]
+
+
+def arrow_stream(table):
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+@pytest.mark.parametrize("path,params", [
+    ("/visualize/arrow", {"viz_type": "bar", "x": "state", "y": "amount"}),
+    ("/process/arrow", {"operations": "[]"}),
+])
+def test_arrow_endpoints_reject_malformed_bodies_with_400(client, path, params):
+    response = client.post(
+        path, params=params, content=b"garbage",
+        headers={"content-type": app_module.ARROW_STREAM_MEDIA_TYPE}
+    )
+
+    assert response.status_code == 400
+
+
+def test_arrow_endpoints_require_the_arrow_content_type(client):
+    response = client.post("/process/arrow", params={"operations": "[]"}, content=b"{}",
+                           headers={"content-type": "application/json"})
+
+    assert response.status_code == 415
+
+
+def test_process_arrow_applies_operations(client, monkeypatch):
+    monkeypatch.setattr(app_module.data_processor, "generate_insights", lambda df, query=None, stats=None: "insights")
+    table = pa.table({"state": ["CA", "NY", "CA", None], "amount": [1.0, 2.0, 3.0, 4.0]})
+    operations = '[{"type": "filter", "params": {"query": "amount > 1"}}, {"type": "sort", "params": {"by": "amount", "ascending": false}}]'
+
+    response = client.post(
+        "/process/arrow", params={"operations": operations}, content=arrow_stream(table),
+        headers={"content-type": app_module.ARROW_STREAM_MEDIA_TYPE}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["data"] == [
+        {"state": None, "amount": 4.0},
+        {"state": "CA", "amount": 3.0},
+        {"state": "NY", "amount": 2.0},
+    ]
+    assert body["insights"] == "insights"
@@ -0,0 +1,41 @@
+import sqlite3
+
+from handlers.db_handler import SQLiteHandler, frame_to_records
+
+
+def make_database(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE sales (id INTEGER, state TEXT, amount REAL)")
+    conn.executemany(
+        "INSERT INTO sales VALUES (?, ?, ?)",
+        [(1, "CA", 10.5), (2, None, 20.0), (3, "NY", None)]
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_records_map_arrow_nulls_to_none(tmp_path):
+    db_path = tmp_path / "sales.db"
+    make_database(db_path)
+    df = SQLiteHandler(str(db_path)).execute_query("SELECT * FROM sales ORDER BY id")
+
+    assert frame_to_records(df) == [
+        {"id": 1, "state": "CA", "amount": 10.5},
+        {"id": 2, "state": None, "amount": 20.0},
+        {"id": 3, "state": "NY", "amount": None},
+    ]
+
+
+def test_self_join_with_duplicate_column_names(tmp_path):
+    db_path = tmp_path / "sales.db"
+    make_database(db_path)
+    df = SQLiteHandler(str(db_path)).execute_query(
+        "SELECT a.*, b.* FROM sales a JOIN sales b ON a.id = b.id ORDER BY a.id"
+    )
+    assert not df.columns.is_unique
+
+    assert frame_to_records(df) == [
+        {"id": 1, "state": "CA", "amount": 10.5},
+        {"id": 2, "state": None, "amount": 20.0},
+        {"id": 3, "state": "NY", "amount": None},
+    ]
@@ -0,0 +1,94 @@
+import pandas as pd
+import pytest
+from sqlalchemy.exc import NoSuchTableError
+
+from db.dynamic_models import DynamicTableManager
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return DynamicTableManager(f"sqlite:///{tmp_path / 'test.db'}")
+
+
+def user_tables(manager):
+    # AUTOINCREMENT ids make SQLite keep its own sqlite_sequence table
+    return [name for name in manager.list_tables() if name != "sqlite_sequence"]
+
+
+def test_insert_creates_typed_table_with_cleaned_names(manager):
+    df = pd.DataFrame({"Unit Price": [1.5, 2.0], "Qty": [3, 4], "City": ["Paris", None]})
+
+    manager.insert_dataframe(df, "Sales Data")
+
+    assert user_tables(manager) == ["sales_data"]
+    assert manager.get_table_schema("sales_data") == {
+        "columns": [
+            {"name": "id", "type": "INTEGER"},
+            {"name": "unit_price", "type": "REAL"},
+            {"name": "qty", "type": "INTEGER"},
+            {"name": "city", "type": "TEXT"},
+        ],
+        "primary_key": ["id"],
+    }
+    assert manager.count_rows("sales_data") == 2
+    assert manager.get_table_data("sales_data") == [
+        {"id": 1, "unit_price": 1.5, "qty": 3, "city": "Paris"},
+        {"id": 2, "unit_price": 2.0, "qty": 4, "city": None},
+    ]
+
+
+def test_arrow_backed_frames_store_nulls_and_nested_values(manager):
+    df = pd.DataFrame({"n": [1, None], "tags": [["a"], ["b", "c"]]}).convert_dtypes(dtype_backend="pyarrow")
+
+    manager.insert_dataframe(df, "t")
+
+    assert [column["type"] for column in manager.get_table_schema("t")["columns"]] == ["INTEGER", "INTEGER", "JSON"]
+    assert [row["n"] for row in manager.get_table_data("t")] == [1, None]
+
+
+def test_replacing_a_table_invalidates_its_cached_schema(manager):
+    manager.insert_dataframe(pd.DataFrame({"a": [1]}), "t")
+    assert [column["name"] for column in manager.get_table_schema("t")["columns"]] == ["id", "a"]
+
+    manager.insert_dataframe(pd.DataFrame({"b": ["x"], "c": [2.5]}), "t")
+
+    assert [column["name"] for column in manager.get_table_schema("t")["columns"]] == ["id", "b", "c"]
+
+
+def test_reset_drops_every_table_and_its_cached_schema(manager):
+    manager.insert_dataframe(pd.DataFrame({"a": [1]}), "t1")
+    manager.insert_dataframe(pd.DataFrame({"a": [1]}), "t2")
+    manager.get_table_schema("t1")
+
+    manager.reset_database()
+
+    assert user_tables(manager) == []
+    with pytest.raises(NoSuchTableError):
+        manager.get_table_schema("t1")
+
+
+def test_replace_all_keeps_only_the_new_table(manager):
+    manager.insert_dataframe(pd.DataFrame({"a": [1]}), "old")
+
+    manager.insert_dataframe(pd.DataFrame({"a": [1]}), "new", replace_all=True)
+
+    assert user_tables(manager) == ["new"]
+
+
+def test_data_version_changes_with_every_write_and_not_on_reads(manager):
+    versions = [manager.data_version]
+
+    manager.insert_dataframe(pd.DataFrame({"a": [1, 2]}), "t")
+    versions.append(manager.data_version)
+    manager.get_table_schema("t")
+    manager.list_tables()
+    manager.count_rows("t")
+    manager.get_table_data("t")
+    assert manager.data_version == versions[-1]
+
+    manager.insert_dataframe(pd.DataFrame({"a": []}), "t")
+    versions.append(manager.data_version)
+    manager.reset_database()
+    versions.append(manager.data_version)
+
+    assert len(set(versions)) == len(versions)
@@ -0,0 +1,259 @@
+import asyncio
+import io
+import threading
+
+import orjson
+import pandas as pd
+import pytest
+from fastapi import HTTPException, Request, Response, UploadFile
+from fastapi.testclient import TestClient
+
+import main
+from llm import query_generator as query_generator_module
+from llm.query_generator import SQLQuery
+
+
+class HangingLLM:
+    """Stands in for ChatGroq; every call waits forever."""
+    def bind(self, **kwargs):
+        return self
+
+    async def ainvoke(self, prompt):
+        await asyncio.Event().wait()
+
+
+def test_startup_does_not_wait_for_the_groq_warmup(monkeypatch):
+    async def run():
+        gate = asyncio.Event()
+
+        async def slow_warmup():
+            await gate.wait()
+
+        monkeypatch.setattr(main.query_generator, "warmup", slow_warmup)
+        await asyncio.wait_for(main.startup_event(), timeout=5)
+        assert not main.warmup_task.done()
+        gate.set()
+        await main.warmup_task
+
+    asyncio.run(run())
+
+
+def test_warmup_gives_up_after_the_timeout(monkeypatch):
+    monkeypatch.setattr(query_generator_module, "WARMUP_TIMEOUT", 0.01)
+    generator = query_generator_module.QueryGenerator()
+    generator._llm = HangingLLM()
+
+    # Returns (after logging) instead of hanging or raising
+    asyncio.run(asyncio.wait_for(generator.warmup(), timeout=5))
+
+
+def csv_upload(content: bytes, filename: str = "data.csv") -> UploadFile:
+    return UploadFile(file=io.BytesIO(content), filename=filename)
+
+
+def test_upload_csv_cleans_column_names_on_the_arrow_path():
+    df = main.read_uploaded_dataset(csv_upload(b" Unit Price,order-id,Region Name\n1.5,7,West\n"))
+
+    assert df.columns.tolist() == ["unit_price", "order_id", "region_name"]
+    assert all(isinstance(dtype, pd.ArrowDtype) for dtype in df.dtypes)
+    assert df.iloc[0].tolist() == [1.5, 7, "West"]
+
+
+def test_upload_csv_with_short_rows_is_padded_like_pandas():
+    df = main.read_uploaded_dataset(csv_upload(b"A,B\n1,2\n3\n"))
+
+    assert df.columns.tolist() == ["a", "b"]
+    assert df["a"].tolist() == [1, 3]
+    assert df["b"].iloc[0] == 2 and pd.isna(df["b"].iloc[1])
+
+
+def test_upload_csv_that_is_not_utf8_is_read_as_latin1():
+    df = main.read_uploaded_dataset(csv_upload("city,n\nMünchen,1\n".encode("latin1")))
+
+    assert df["city"].tolist() == ["München"]
+
+
+def test_upload_csv_that_neither_parser_accepts_is_a_400():
+    with pytest.raises(HTTPException) as excinfo:
+        main.read_uploaded_dataset(csv_upload(b"a,b\n1,2,3,4\n\"unterminated\n"))
+
+    assert excinfo.value.status_code == 400
+
+
+@pytest.fixture
+def fresh_dataset_state(monkeypatch):
+    # Each test runs its own event loop; a lock that was contended in another loop stays bound to it
+    monkeypatch.setattr(main, "dataset_lock", asyncio.Lock())
+    monkeypatch.setattr(main, "current_dataset_snapshot", None)
+
+
+def dataset_request(headers: dict = None) -> Request:
+    raw_headers = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/api/dataset", "headers": raw_headers})
+
+
+def test_dataset_lookup_racing_an_upload_cannot_cache_the_old_dataset(fresh_dataset_state, monkeypatch):
+    main.table_manager.insert_dataframe(pd.DataFrame({"old": [1, 2]}), "current_dataset", replace_all=True)
+    started, release = threading.Event(), threading.Event()
+    load = main.load_current_dataset_info
+
+    def slow_load():
+        started.set()
+        release.wait(5)
+        return load()
+
+    monkeypatch.setattr(main, "load_current_dataset_info", slow_load)
+
+    async def run():
+        lookup = asyncio.create_task(main.get_current_dataset(dataset_request(), Response()))
+        await asyncio.to_thread(started.wait, 5)
+        upload = asyncio.create_task(main.upload_dataset(csv_upload(b"new\n1\n2\n3\n")))
+        await asyncio.sleep(0.05)
+        release.set()
+        return await lookup, await upload
+
+    old_info, new_info = asyncio.run(run())
+
+    assert old_info.row_count == 2
+    assert new_info.row_count == 3
+    # The upload's snapshot is the one kept, tagged with the version it describes
+    assert main.current_dataset_snapshot == (main.table_manager.data_version, new_info)
+    assert asyncio.run(main.get_current_dataset(dataset_request(), Response())) is new_info
+
+
+def test_dataset_from_before_a_restart_has_an_unknown_upload_time(fresh_dataset_state):
+    main.table_manager.insert_dataframe(pd.DataFrame({"n": [1, 2, 3]}), "current_dataset", replace_all=True)
+
+    info = asyncio.run(main.get_current_dataset(dataset_request(), Response()))
+
+    assert info.row_count == 3
+    assert info.created_at is None
+
+
+def test_dataset_etag_names_the_version_of_the_returned_snapshot(fresh_dataset_state):
+    main.table_manager.insert_dataframe(pd.DataFrame({"n": [1]}), "current_dataset", replace_all=True)
+    response = Response()
+
+    async def run():
+        # The lookup reads the version, then waits on an upload that is still replacing the table
+        async with main.dataset_lock:
+            lookup = asyncio.create_task(main.get_current_dataset(dataset_request(), response))
+            await asyncio.sleep(0.05)
+            main.table_manager.insert_dataframe(pd.DataFrame({"n": [1, 2, 3]}), "current_dataset", replace_all=True)
+        return await lookup
+
+    info = asyncio.run(run())
+
+    assert info.row_count == 3
+    assert response.headers["ETag"] == f'"{main.table_manager.data_version}"'
+
+
+def test_dataset_is_not_modified_for_the_current_etag(fresh_dataset_state):
+    main.table_manager.insert_dataframe(pd.DataFrame({"n": [1, 2]}), "current_dataset", replace_all=True)
+    client = TestClient(main.app)
+
+    first = client.get("/api/dataset")
+    assert first.status_code == 200
+    assert first.json()["row_count"] == 2
+
+    cached = client.get("/api/dataset", headers={"If-None-Match": first.headers["ETag"]})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == first.headers["ETag"]
+
+    main.table_manager.insert_dataframe(pd.DataFrame({"n": [1]}), "current_dataset", replace_all=True)
+    changed = client.get("/api/dataset", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200
+    assert changed.json()["row_count"] == 1
+    assert changed.headers["ETag"] != first.headers["ETag"]
+
+
+@pytest.fixture
+def chat_client(fresh_dataset_state, monkeypatch):
+    main.table_manager.insert_dataframe(
+        pd.DataFrame({"city": ["Paris", "Rome", "Oslo"], "sales": [3.0, 1.0, 2.0]}), "current_dataset", replace_all=True
+    )
+
+    # The message is the SQL to run; "fail" makes the generator raise
+    async def agenerate_query(question, table_name=None, table_schema=None, history=None):
+        if question == "fail":
+            raise RuntimeError("generation failed")
+        return SQLQuery(query=question, explanation="explained", summary="summarized")
+
+    monkeypatch.setattr(main.query_generator, "agenerate_query", agenerate_query)
+    return TestClient(main.app)
+
+
+def test_chat_rows_streams_a_header_then_one_line_per_row(chat_client, monkeypatch):
+    monkeypatch.setattr(main, "ROW_BATCH_SIZE", 2)
+
+    response = chat_client.post("/api/chat/rows", json={
+        "message": "SELECT city, sales FROM current_dataset ORDER BY sales"
+    })
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith(main.NDJSON_MEDIA_TYPE)
+    header, *rows = [orjson.loads(line) for line in response.content.splitlines()]
+    assert header == {
+        "query": "SELECT city, sales FROM current_dataset ORDER BY sales",
+        "explanation": "explained", "summary": "summarized", "type": "data_analysis"
+    }
+    assert rows == [{"city": "Rome", "sales": 1.0}, {"city": "Oslo", "sales": 2.0}, {"city": "Paris", "sales": 3.0}]
+
+
+def test_chat_rows_reports_a_failing_query_as_a_final_error_line(chat_client):
+    response = chat_client.post("/api/chat/rows", json={"message": "SELECT missing FROM current_dataset"})
+
+    assert response.status_code == 200
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert lines[-1]["type"] == "error"
+    assert "missing" in lines[-1]["detail"]
+
+
+def test_chat_rows_answers_special_responses_in_a_single_header_line(chat_client):
+    response = chat_client.post("/api/chat/rows", json={"message": "hello"})
+
+    lines = [orjson.loads(line) for line in response.content.splitlines()]
+    assert len(lines) == 1
+    assert lines[0]["type"] == "greeting" and lines[0]["data"] == []
+
+
+def test_chat_batch_isolates_failing_messages_and_keeps_request_order(chat_client):
+    response = chat_client.post("/api/chat_batch", json=[
+        {"message": "SELECT COUNT(*) AS n FROM current_dataset"},
+        {"message": "fail"},
+        {"message": "SELECT nope FROM current_dataset"},
+        {"message": "hello"},
+    ])
+
+    assert response.status_code == 200
+    counted, failed, bad_sql, greeting = response.json()
+    assert counted["type"] == "data_analysis" and counted["data"] == [{"n": 3}]
+    assert failed["type"] == "error" and "generation failed" in failed["explanation"]
+    assert bad_sql["type"] == "error" and "nope" in bad_sql["explanation"]
+    assert greeting["type"] == "greeting"
+
+
+def test_chat_stream_streams_general_knowledge_as_text(chat_client, monkeypatch):
+    async def astream_general_knowledge(question, history=None):
+        for chunk in ("Python is ", "a language."):
+            yield chunk
+
+    monkeypatch.setattr(main.query_generator, "is_general_knowledge_question", lambda question, table_name=None: True)
+    monkeypatch.setattr(main.query_generator, "astream_general_knowledge", astream_general_knowledge)
+
+    response = chat_client.post("/api/chat/stream", json={"message": "who made python?"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert response.text == "Python is a language."
+
+
+def test_chat_stream_answers_data_questions_like_chat(chat_client, monkeypatch):
+    monkeypatch.setattr(main.query_generator, "is_general_knowledge_question", lambda question, table_name=None: False)
+    message = {"message": "SELECT city FROM current_dataset WHERE sales > 2"}
+
+    streamed = chat_client.post("/api/chat/stream", json=message)
+
+    assert streamed.status_code == 200
+    assert streamed.json() == chat_client.post("/api/chat", json=message).json()
+    assert streamed.json()["data"] == [{"city": "Paris"}]
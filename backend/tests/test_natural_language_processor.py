@@ -0,0 +1,101 @@
+import random
+import re
+
+import pandas as pd
+import pytest
+
+from processors.natural_language_processor import NaturalLanguageProcessor
+
+# The original per-pattern lists; each category is now one fused, case-insensitive regex
+QUERY_PATTERNS = {
+    'category_analysis': [
+        r'which.*(?:category|city|state|region|location).*(?:highest|most|top|best)',
+        r'what.*(?:category|city|state|region|location).*(?:highest|most|top|best)',
+        r'(?:highest|most|top|best).*(?:category|city|state|region|location)',
+        r'(?:category|city|state|region|location).*(?:performance|sales|revenue)',
+        r'show.*top.*(?:category|city|state|region|location)',
+        r'list.*top.*(?:category|city|state|region|location)'
+    ],
+    'product_analysis': [
+        r'which.*product.*highest', r'what.*product.*most', r'best.*product',
+        r'top.*product', r'product.*performance', r'product.*volume'
+    ],
+    'customer_analysis': [
+        r'which.*customer.*most', r'what.*customer.*highest', r'best.*customer',
+        r'top.*customer', r'customer.*purchase', r'customer.*frequent'
+    ],
+    'time_analysis': [r'trend', r'over time', r'by month', r'by year', r'by date', r'period']
+}
+COLUMN_PATTERNS = {
+    'category': [r'category', r'type', r'group', r'class', r'segment', r'city', r'state', r'region', r'location'],
+    'product': [r'product', r'item', r'sku', r'goods', r'merchandise'],
+    'customer': [r'customer', r'client', r'buyer', r'user', r'account'],
+    'sales': [r'sales', r'revenue', r'amount', r'value', r'price', r'cost'],
+    'quantity': [r'quantity', r'qty', r'volume', r'count', r'number', r'units'],
+    'date': [r'date', r'time', r'period', r'month', r'year', r'day']
+}
+
+
+def original_query_type(question: str) -> str:
+    question_lower = question.lower()
+    for query_type, patterns in QUERY_PATTERNS.items():
+        for pattern in patterns:
+            if re.search(pattern, question_lower):
+                return query_type
+    return 'general_analysis'
+
+
+def original_column_roles(columns) -> dict:
+    roles = {}
+    for col in columns:
+        for category, patterns in COLUMN_PATTERNS.items():
+            for pattern in patterns:
+                if re.search(pattern, col.lower()):
+                    if category not in roles:
+                        roles[category] = col
+                        break
+    return roles
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    return NaturalLanguageProcessor()
+
+
+WORDS = [
+    'which', 'what', 'show', 'list', 'top', 'best', 'highest', 'most', 'City', 'STATE', 'region',
+    'category', 'location', 'performance', 'Sales', 'revenue', 'product', 'volume', 'customer',
+    'purchase', 'frequent', 'trend', 'over', 'time', 'by', 'month', 'year', 'date', 'period',
+    'the', 'of', 'me', 'has', 'and', 'in',
+]
+
+
+def test_query_type_matches_the_per_pattern_search(nlp):
+    rng = random.Random(0)
+    questions = [
+        'Which city has the highest sales?', 'Show me the TOP products', 'sales trend by month',
+        'Who are our best customers', 'What is the average price', '',
+    ] + [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 6))) for _ in range(3000)]
+    for question in questions:
+        assert nlp.identify_query_type(question) == original_query_type(question), question
+
+
+def test_column_roles_match_the_per_pattern_search(nlp):
+    rng = random.Random(1)
+    names = [
+        'Order_Date', 'CustomerID', 'unit_price', 'Product Name', 'qty', 'Region', 'account_type',
+        'total_sales', 'SKU', 'notes', 'day_of_week', 'client_segment', 'Units', 'id',
+    ]
+    for _ in range(500):
+        columns = rng.sample(names, rng.randint(1, len(names)))
+        df = pd.DataFrame(columns=columns)
+        assert nlp.identify_relevant_columns(df, 'general_analysis') == original_column_roles(columns), columns
+
+
+def test_cached_column_roles_are_not_shared_with_callers(nlp):
+    df = pd.DataFrame({'region': ['a', 'a', 'b', 'b'], 'name': ['x', 'y', 'z', 'w']})
+
+    roles = nlp.identify_relevant_columns(df, 'product_analysis')
+    roles['extra'] = 'mutated'
+
+    assert nlp.identify_relevant_columns(df, 'general_analysis') == {'category': 'region'}
@@ -0,0 +1,23 @@
+from llm.query_generator import QueryGenerator
+
+SCHEMA = {'columns': [{'name': 'price', 'type': 'REAL'}, {'name': 'city', 'type': 'TEXT'}]}
+
+
+def cache_key(question: str):
+    return QueryGenerator._query_cache_key(question, "current_dataset", SCHEMA)
+
+
+def test_comparison_operators_never_share_a_cache_entry():
+    keys = {cache_key(q) for q in ("price > 100", "price < 100", "price != 100", "price = 100")}
+    assert len(keys) == 4
+
+
+def test_literal_punctuation_and_case_are_kept():
+    assert cache_key("top 5% of sales") != cache_key("top 5 of sales")
+    assert cache_key("sales in 2023-01") != cache_key("sales in 2023 01")
+    assert cache_key("city is Paris") != cache_key("city is paris")
+
+
+def test_whitespace_and_trailing_punctuation_are_normalized():
+    assert cache_key("  price > 100 ?") == cache_key("price > 100")
+    assert cache_key("price   >  100!") == cache_key("price > 100")
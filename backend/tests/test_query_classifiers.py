@@ -0,0 +1,171 @@
+import random
+import re
+
+import pytest
+from rapidfuzz import fuzz
+from rapidfuzz.utils import default_process
+
+from llm import query_generator as qg
+
+# The keyword checks were rewritten as fused regexes and pruned fuzzy lookups; the references
+# below are the original one-check-per-keyword implementations they must agree with.
+
+
+def original_is_greeting(message_lower: str) -> bool:
+    for greeting in qg.GREETINGS:
+        if re.match(r'^' + re.escape(greeting) + r'(\b|$)', message_lower):
+            return True
+    return any(
+        fuzz.ratio(default_process(message_lower), default_process(phrase)) >= 80
+        for phrase in qg.GREETING_PHRASES
+    )
+
+
+def original_is_help_request(message_lower: str) -> bool:
+    return any(keyword in message_lower for keyword in qg.HELP_RESPONSES)
+
+
+def original_is_operation_question(message_lower: str) -> bool:
+    return any(keyword in message_lower for keyword in qg.OPERATION_KEYWORDS)
+
+
+def original_get_help_response(message_lower: str) -> str:
+    for keyword, response in qg.HELP_RESPONSES.items():
+        if keyword in message_lower:
+            return response
+    return qg.HELP_RESPONSES['help']
+
+
+def original_is_knowledge_base_question(message_lower: str):
+    if message_lower in qg.KNOWLEDGE_BASE_PHRASES:
+        return message_lower
+    best_score, best = 0, None
+    for choice in list(qg.KNOWLEDGE_BASE_PHRASES) + list(qg.KNOWLEDGE_BASE):
+        score = fuzz.token_sort_ratio(message_lower, choice, processor=default_process)
+        if score > best_score:
+            best_score, best = score, choice
+    return best if best_score >= 80 else None
+
+
+def original_is_data_analysis_question(generator, question_lower: str) -> bool:
+    if generator.is_knowledge_base_question(question_lower):
+        return False
+    if any(question_lower.startswith(prefix) for prefix in qg.GENERAL_KNOWLEDGE_PREFIXES):
+        return False
+    patterns = [
+        'show me', 'display', 'list', 'find', 'calculate', 'compute', 'analyze',
+        'compare', 'what is the', 'how many', 'what are the', 'what is the average',
+        'what is the total', 'what is the sum', 'what is the count', 'what is the maximum',
+        'what is the minimum', 'group by', 'filter', 'sort', 'order by'
+    ]
+    if any(pattern in question_lower for pattern in patterns):
+        return True
+    if any(word in qg._QUESTION_KEYWORDS for word in question_lower.split()):
+        return True
+    return any(re.search(pattern, question_lower) for pattern in qg.TOP_BOTTOM_PATTERNS)
+
+
+def build_corpus():
+    phrases = sorted(
+        set(qg.GREETING_PHRASES) | set(qg.GREETINGS) | set(qg.HELP_RESPONSES) | set(qg.OPERATION_KEYWORDS)
+        | set(qg.KNOWLEDGE_BASE_PHRASES) | set(qg.KNOWLEDGE_BASE) | set(qg._QUESTION_KEYWORDS)
+    )
+    corpus = set()
+    for phrase in phrases:
+        corpus.update({
+            phrase, phrase[:-1], phrase + 's', phrase + '!', phrase + '?', f'please {phrase} now',
+            f'{phrase} the sales data', f'so {phrase}', phrase.replace(' ', ''),
+        })
+    corpus.update({
+        '', 'history', 'hip', 'heya', 'hey!', 'hi, show me the top 5 rows', 'helpful',
+        'yo-yo sales', 'supported formats', 'which city has the highest sales',
+        'show the top 10 products', 'last 3 months', 'what is the average price',
+        'what is python', 'tell me about machine learning', 'order by date',
+        'how many customers bought more than once', 'what can you do for me',
+        # Several help keywords at once: the first in dict order must win, not the first in the text
+        'how to use this, what can you do? help', 'what can you do - how to use it',
+    })
+    vocabulary = sorted({word for phrase in phrases for word in phrase.split()} | {
+        'the', 'sales', 'by', 'region', 'me', 'of', '5', '10', 'rows', 'price', 'please', 'and'
+    })
+    rng = random.Random(0)
+    for _ in range(3000):
+        corpus.add(' '.join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5))))
+    return sorted(corpus)
+
+
+CORPUS = build_corpus()
+
+
+@pytest.fixture(scope="module")
+def generator():
+    return qg.QueryGenerator()
+
+
+def test_intent_regexes_match_the_per_keyword_checks(generator):
+    for message in CORPUS:
+        assert generator.is_greeting(message) == original_is_greeting(message), message
+        assert generator.is_help_request(message) == original_is_help_request(message), message
+        assert generator.is_operation_question(message) == original_is_operation_question(message), message
+
+
+def test_classify_intent_matches_the_checks_in_priority_order(generator):
+    for message in CORPUS:
+        if original_is_greeting(message):
+            expected = 'greeting'
+        elif original_is_help_request(message):
+            expected = 'help'
+        elif original_is_operation_question(message):
+            expected = 'operation'
+        else:
+            expected = None
+        assert generator._classify_intent(message) == expected, message
+
+
+def test_help_response_picks_the_first_keyword_in_dict_order(generator):
+    for message in CORPUS:
+        assert generator.get_help_response(message) == original_get_help_response(message), message
+
+
+def test_knowledge_base_lookup_matches_the_full_scan(generator):
+    for message in CORPUS:
+        assert generator.is_knowledge_base_question(message) == original_is_knowledge_base_question(message), message
+
+
+def test_data_analysis_question_matches_the_per_pattern_checks(generator):
+    for message in CORPUS:
+        expected = original_is_data_analysis_question(generator, message)
+        assert generator.is_data_analysis_question(message) == expected, message
+
+
+@pytest.mark.parametrize("phrases", [
+    ['a', 'ab', 'abc', 'b'],
+    ['show me', 'show me what', 'show', 'sh'],
+    ['can do', 'capabilities', 'c++', 'a.b', '(x)'],
+    list(qg.OPERATION_KEYWORDS),
+    list(qg.HELP_RESPONSES),
+])
+def test_compiled_alternation_matches_substring_search(phrases):
+    pattern = qg._compile_alternation(phrases)
+    samples = CORPUS + ['abc', 'xabx', 'c++ code', 'a-b', 'axb', '(x)', 'x', 'shows']
+    for text in samples:
+        assert bool(pattern.search(text)) == any(phrase in text for phrase in phrases), text
+
+
+def test_ratio_reach_never_prunes_a_reachable_choice():
+    rng = random.Random(1)
+    alphabet = 'abcde '
+    for _ in range(5000):
+        query = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        choice = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        # Mutate a copy of the query so high scores are well represented
+        if rng.random() < 0.5:
+            choice = query[:rng.randint(0, len(query))] + choice[:rng.randint(0, 3)]
+        if fuzz.ratio(query, choice) >= 80:
+            assert qg._within_ratio_reach(query, len(choice)), (query, choice)
+            assert qg._within_ratio_reach(query, len(choice) + rng.randint(0, 10)), (query, choice)
+
+
+def test_ratio_reach_prunes_queries_far_longer_than_every_choice():
+    assert not qg._within_ratio_reach('x' * 100, qg.GREETING_MAX_LEN)
+    assert qg._within_ratio_reach('hello', qg.GREETING_MAX_LEN)
@@ -6,5 +6,5 @@ export interface ColumnInfo {
 export interface DatasetInfo {
   columns: ColumnInfo[];
   row_count: number;
-  created_at: string;
+  created_at: string | null;
 } 
\ No newline at end of file